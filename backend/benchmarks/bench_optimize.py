@@ -0,0 +1,162 @@
+"""Load benchmark for the optimize pipeline, runnable offline against the fake LLM provider.
+
+    cd backend
+    python -m benchmarks.bench_optimize --concurrency 1,4,16 --requests 40
+
+Stages:
+  parse  aparse_file_to_markdown over the sample corpus (parser process pool)
+  llm    generate_optimized_html against the fake model
+  http   POST /api/optimize end to end against a uvicorn server (spawned
+         locally unless --url points at a running one)
+
+Caches are disabled so every request does the full work. Peak memory is the
+RSS of the process tree doing the work: this process for parse/llm (the
+parser pool children included), the server for http.
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def configure_env(args):
+    # Must run before resume_backend is imported: Settings reads the environment once
+    os.environ.update({
+        "LLM_PROVIDER": "fake",
+        "FAKE_LLM_TTFT_SECONDS": str(args.ttft),
+        "FAKE_LLM_TOKENS_PER_SECOND": str(args.tokens_per_second),
+        "FAKE_LLM_ERROR_RATE": str(args.error_rate),
+        "GROQ_REQUESTS_PER_MINUTE": "1000000",
+        "GROQ_TOKENS_PER_MINUTE": "1000000000",
+        "GROQ_MAX_CONCURRENCY": "1000",
+        "PARSE_CACHE_MAX_MB": "0",
+        "PARSE_CACHE_DB_PATH": "",
+        "RESULT_CACHE_MAX_MB": "0",
+        "RESULT_CACHE_DB_PATH": "",
+        "JOBS_WORKERS": "0",
+        "JOBS_DB_PATH": os.path.join(tempfile.mkdtemp(prefix="bench-"), "jobs.sqlite3"),
+    })
+
+
+async def bench_parse(levels, total):
+    from benchmarks.corpus import build_corpus
+    from benchmarks.stats import run_load
+    from resume_backend.services.document_parser import aparse_file_to_markdown, parser_pool
+
+    corpus = build_corpus()
+    # Start every pool process outside the measurement
+    await asyncio.gather(*(aparse_file_to_markdown(data, name) for name, data, _ in corpus[:parser_pool.size]))
+    results = []
+    for level in levels:
+        async def one(i):
+            filename, data, _ = corpus[i % len(corpus)]
+            await aparse_file_to_markdown(data, filename)
+        results.append(await run_load("parse", level, total, one))
+    parser_pool.shutdown()
+    return results
+
+
+async def bench_llm(levels, total):
+    from benchmarks.corpus import JOB_DESCRIPTIONS, build_corpus
+    from benchmarks.stats import run_load
+    from resume_backend.services.document_parser import parse_file_to_markdown
+    from resume_backend.services.llm_chain import generate_optimized_html
+
+    resumes = [parse_file_to_markdown(data, name) for name, data, _ in build_corpus()]
+    results = []
+    for level in levels:
+        async def one(i):
+            jd = JOB_DESCRIPTIONS[i % len(JOB_DESCRIPTIONS)] + f"\n(run {level}-{i})"
+            await generate_optimized_html(resumes[i % len(resumes)], jd)
+        results.append(await run_load("llm", level, total, one))
+    return results
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def _wait_ready(client, url: str, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get(url + "/ready")).status_code == 200:
+                return
+        except Exception:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError(f"Server at {url} did not become ready")
+
+
+async def bench_http(levels, total, url: str | None):
+    import httpx
+    from benchmarks.corpus import JOB_DESCRIPTIONS, build_corpus
+    from benchmarks.stats import run_load
+
+    server = None
+    if url is None:
+        port = _free_port()
+        url = f"http://127.0.0.1:{port}"
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "resume_backend.main:app", "--port", str(port), "--log-level", "warning"],
+            env=os.environ.copy(),
+        )
+    corpus = build_corpus()
+    results = []
+    try:
+        async with httpx.AsyncClient(timeout=300, limits=httpx.Limits(max_connections=max(levels))) as client:
+            await _wait_ready(client, url)
+            for level in levels:
+                async def one(i):
+                    filename, data, content_type = corpus[i % len(corpus)]
+                    jd = JOB_DESCRIPTIONS[i % len(JOB_DESCRIPTIONS)] + f"\n(run {level}-{i})"
+                    response = await client.post(url + "/api/optimize", files={"resume": (filename, data, content_type)},
+                                                 data={"job_description": jd})
+                    response.raise_for_status()
+                results.append(await run_load("http", level, total, one, memory_pid=server.pid if server else None))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+    return results
+
+
+async def main(args):
+    levels = [int(x) for x in args.concurrency.split(",")]
+    stages = args.stages.split(",")
+    results = []
+    if "parse" in stages:
+        results += await bench_parse(levels, args.requests)
+    if "llm" in stages:
+        results += await bench_llm(levels, args.requests)
+    if "http" in stages:
+        results += await bench_http(levels, args.requests, args.url)
+
+    from benchmarks.stats import print_table
+    rows = [r.summary() for r in results]
+    print_table(rows)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stages", default="parse,llm,http")
+    parser.add_argument("--concurrency", default="1,4,16", help="comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=40, help="requests per stage and concurrency level")
+    parser.add_argument("--url", help="benchmark an already running server instead of spawning one")
+    parser.add_argument("--ttft", type=float, default=0.4, help="fake LLM time to first token (s)")
+    parser.add_argument("--tokens-per-second", type=float, default=500.0, help="fake LLM generation speed")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fake LLM failure probability")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+    configure_env(args)
+    asyncio.run(main(args))
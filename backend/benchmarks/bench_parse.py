@@ -0,0 +1,122 @@
+"""PDF extraction benchmark on 1-, 10- and 100-page documents.
+
+    cd backend
+    python -m benchmarks.bench_parse --requests 10
+
+Modes:
+  full      every page, concatenated with +=: the extractor before the budget
+  budget    parse_file_to_markdown (page by page, stops at RESUME_MAX_CHARS / PARSE_MAX_PAGES)
+  pool      aparse_file_to_markdown through the parser pool, one task per document
+  parallel  aparse_file_to_markdown with the pages split across the parser pool
+
+The parse cache is disabled. peak_mb is the tracemalloc peak of one extra untimed run
+for the in-process modes, and the RSS of this process plus the pool workers otherwise.
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import time
+import tracemalloc
+
+LINES_PER_PAGE = 50  # what benchmarks.corpus.make_pdf fits on a page
+
+
+def configure_env():
+    # Must run before resume_backend is imported: Settings reads the environment once
+    os.environ.update({"PARSE_CACHE_MAX_MB": "0", "PARSE_CACHE_DB_PATH": "", "LLM_PROVIDER": "fake"})
+
+
+def pdf_with_pages(pages: int) -> bytes:
+    from benchmarks.corpus import make_pdf, resume_lines
+
+    lines = []
+    seed = 0
+    while len(lines) < pages * LINES_PER_PAGE:
+        lines += resume_lines(seed, 8)
+        seed += 1
+    return make_pdf(lines[:pages * LINES_PER_PAGE])
+
+
+def extract_full(file_bytes: bytes) -> str:
+    from PyPDF2 import PdfReader
+
+    text = ""
+    for page in PdfReader(io.BytesIO(file_bytes)).pages:
+        page_text = page.extract_text()
+        if page_text:
+            text += page_text + "\n"
+    return text.strip()
+
+
+def bench_inline(mode: str, label: str, fn, data: bytes, total: int) -> dict:
+    from benchmarks.stats import StageResult
+
+    result = StageResult(f"{mode}/{label}", 1)
+    started = time.perf_counter()
+    for _ in range(total):
+        begin = time.perf_counter()
+        fn(data)
+        result.latencies.append(time.perf_counter() - begin)
+    result.elapsed = time.perf_counter() - started
+    tracemalloc.start()
+    fn(data)
+    result.peak_mb = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+    tracemalloc.stop()
+    return result.summary()
+
+
+async def bench_pool(mode: str, samples: dict[str, bytes], total: int) -> list[dict]:
+    from benchmarks.stats import run_load
+    from resume_backend.core.config import settings
+    from resume_backend.services.document_parser import aparse_file_to_markdown, parser_pool
+
+    # 2 pages and up are split across the pool in parallel mode
+    settings.PARSE_PARALLEL_MIN_PAGES = 2 if mode == "parallel" else 0
+    await asyncio.gather(*(aparse_file_to_markdown(samples["1-page"], f"warm{i}.pdf") for i in range(parser_pool.size)))
+    results = []
+    for label, data in samples.items():
+        results.append((await run_load(f"{mode}/{label}", 1, total,
+                                       lambda i: aparse_file_to_markdown(data, "resume.pdf"))).summary())
+    return results
+
+
+async def main(args):
+    from benchmarks.stats import print_table
+    from resume_backend.services.document_parser import parse_file_to_markdown, parser_pool
+
+    samples = {f"{pages}-page": pdf_with_pages(pages) for pages in (1, 10, 100)}
+    # parallel can only beat pool with more than one CPU
+    print(f"{os.cpu_count()} CPUs, parser pool size {parser_pool.size}")
+    for label, data in samples.items():
+        print(f"{label}: {len(data)} bytes, {len(extract_full(data))} chars in full, "
+              f"{len(parse_file_to_markdown(data, 'resume.pdf'))} chars within budget")
+
+    modes = args.modes.split(",")
+    rows = []
+    for label, data in samples.items():
+        if "full" in modes:
+            rows.append(bench_inline("full", label, extract_full, data, args.requests))
+        if "budget" in modes:
+            rows.append(bench_inline("budget", label, lambda d: parse_file_to_markdown(d, "resume.pdf"),
+                                     data, args.requests))
+    for mode in ("pool", "parallel"):
+        if mode in modes:
+            rows += await bench_pool(mode, samples, args.requests)
+    parser_pool.shutdown()
+
+    print_table(rows)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modes", default="full,budget,pool,parallel")
+    parser.add_argument("--requests", type=int, default=10, help="extractions per mode and document")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+    configure_env()
+    asyncio.run(main(args))
@@ -0,0 +1,106 @@
+"""Response payload: HTML compaction and gzip/brotli, by resume length.
+
+    cd backend
+    python -m benchmarks.bench_payload --roles 2,4,8,12 --repeat 200
+
+For each resume (rendered from the template, as GENERATION_MODE=json and the fake
+provider produce it) the raw and the compacted HTML are compared:
+  html        HTML size in bytes, and compact_ms, the time compact_html takes
+  json        /api/optimize response body ({"html": ...}) in bytes, and json_ms,
+              the time JSONResponse takes to serialize it
+  gzip / br   compressed body in bytes, and the time to compress it
+                (br needs brotli or brotlicffi)
+Times are medians over --repeat runs, in milliseconds.
+"""
+import argparse
+import gzip
+import json
+import random
+import statistics
+import time
+
+
+def resume_html(roles: int, seed: int) -> str:
+    from benchmarks.corpus import SKILLS, THINGS, VERBS
+    from resume_backend.services.html_renderer import render_resume_html
+    from resume_backend.services.resume_schema import ResumeData
+
+    rng = random.Random(seed)
+    resume = ResumeData(
+        full_name=f"Candidate {seed}",
+        contact={"location": "Austin, TX", "phone": "(555) 010-0000", "email": f"candidate{seed}@example.com",
+                 "linkedin": f"linkedin.com/in/candidate{seed}"},
+        summary=f"Backend engineer with {roles * 2} years of experience in {', '.join(rng.sample(SKILLS, 4))}, "
+                f"owning distributed services end to end, from design docs to on-call.",
+        competencies=rng.sample(SKILLS, 9),
+        experience=[
+            {"company": f"Company {seed}-{role}", "location": "Remote", "title": "Senior Software Engineer",
+             "start_date": str(2022 - 2 * role), "end_date": "Present" if role == 0 else str(2024 - 2 * role),
+             "bullets": [f"{rng.choice(VERBS)} the {rng.choice(THINGS)} with {rng.choice(SKILLS)} and "
+                         f"{rng.choice(SKILLS)}, cutting p99 latency by {rng.randint(10, 70)}% for "
+                         f"{rng.randint(2, 40)}M requests a day" for _ in range(5)]}
+            for role in range(roles)
+        ],
+        skills={"languages": ", ".join(rng.sample(SKILLS, 4)), "frameworks": ", ".join(rng.sample(SKILLS, 4)),
+                "cloud_devops": ", ".join(rng.sample(SKILLS, 4)), "tools": ", ".join(rng.sample(SKILLS, 3))},
+        projects=[{"name": "Open-source rate limiter", "tech_stack": "Go, Redis",
+                   "bullets": ["Token-bucket limiter used by 40+ services", "Cut p99 overhead to 80µs"]}],
+        education=[{"institution": "State University", "location": "Austin, TX", "degree": "B.S. Computer Science",
+                    "graduation_date": "2014"}],
+        certifications=[{"name": "AWS Certified Solutions Architect", "issuer": "Amazon", "year": "2022"}],
+    )
+    return render_resume_html(resume)
+
+
+def _median_ms(fn, repeat: int):
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - started)
+    return result, round(statistics.median(times) * 1000, 3)
+
+
+def measure(label: str, html: str, repeat: int, args) -> dict:
+    from fastapi.responses import JSONResponse
+    from resume_backend.core.middleware import _brotli
+
+    body, json_ms = _median_ms(lambda: JSONResponse({"html": html}).body, repeat)
+    row = {"payload": label, "html": len(html.encode("utf-8")), "json": len(body), "json_ms": json_ms}
+    compressed, row["gzip_ms"] = _median_ms(lambda: gzip.compress(body, compresslevel=args.gzip_level, mtime=0), repeat)
+    row["gzip"] = len(compressed)
+    if _brotli() is not None:
+        compressed, row["br_ms"] = _median_ms(lambda: _brotli().compress(body, quality=args.brotli_quality), repeat)
+        row["br"] = len(compressed)
+    return row
+
+
+def main(args):
+    from resume_backend.services.html_compaction import compact_html
+
+    rows = []
+    for roles in [int(r) for r in args.roles.split(",")]:
+        raw = resume_html(roles, roles)
+        compacted, compact_ms = _median_ms(lambda: compact_html(raw), args.repeat)
+        rows.append(measure(f"raw/{roles} roles", raw, args.repeat, args))
+        rows.append({**measure(f"compact/{roles} roles", compacted, args.repeat, args), "compact_ms": compact_ms})
+
+    columns = [c for c in ("payload", "html", "compact_ms", "json", "json_ms", "gzip", "gzip_ms", "br", "br_ms")
+               if any(c in row for row in rows)]
+    widths = {c: max(len(c), *(len(str(row.get(c, "-"))) for row in rows)) for c in columns}
+    print("  ".join(c.rjust(widths[c]) for c in columns))
+    for row in rows:
+        print("  ".join(str(row.get(c, "-")).rjust(widths[c]) for c in columns))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--roles", default="2,4,8,12", help="comma-separated experience blocks per resume")
+    parser.add_argument("--repeat", type=int, default=200, help="timed runs per measurement")
+    parser.add_argument("--gzip-level", type=int, default=6)
+    parser.add_argument("--brotli-quality", type=int, default=5)
+    parser.add_argument("--json", help="also write the results to this file")
+    main(parser.parse_args())
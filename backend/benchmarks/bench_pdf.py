@@ -0,0 +1,151 @@
+"""Render-time and memory benchmark for the PDF renderer (/api/optimize/pdf).
+
+    cd backend
+    python -m benchmarks.bench_pdf --concurrency 1,4 --requests 40
+
+Stages, each run on a typical one-page and two-page resume:
+  inline  _compile_sync in this process; peak_mb is the tracemalloc peak of one
+          extra (untimed) render
+  pool    html_to_pdf through the render worker pool with the PDF cache disabled;
+          peak_mb is the RSS of this process plus the pool workers
+  cached  html_to_pdf for an HTML that was already rendered (cache hit)
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import time
+import tracemalloc
+
+
+def configure_env():
+    # Must run before resume_backend is imported: Settings reads the environment once
+    os.environ.update({"PDF_CACHE_MAX_MB": "0", "PDF_CACHE_DB_PATH": "", "LLM_PROVIDER": "fake"})
+
+
+def sample_html(roles: int, projects: int) -> str:
+    from benchmarks.corpus import SKILLS, THINGS, VERBS
+    from resume_backend.services.html_renderer import render_resume_html
+    from resume_backend.services.resume_schema import ResumeData
+
+    resume = ResumeData(
+        full_name="Jordan Example",
+        contact={"email": "jordan@example.com", "phone": "(555) 010-0000", "location": "Austin, TX",
+                 "linkedin": "linkedin.com/in/jordan-example"},
+        summary="Backend engineer with a decade of experience building and operating distributed systems, "
+                "data platforms and developer tooling at product companies of every size.",
+        competencies=SKILLS[:9],
+        experience=[
+            {"company": f"Company {i}", "location": "Austin, TX", "title": "Senior Software Engineer",
+             "start_date": f"Jan {2022 - 2 * i}", "end_date": "Present" if i == 0 else f"Dec {2023 - 2 * i}",
+             "bullets": [f"{VERBS[(i + j) % len(VERBS)]} the {THINGS[(i * 3 + j) % len(THINGS)]} in "
+                         f"{SKILLS[(i + j) % len(SKILLS)]}, cutting p95 latency by {20 + 7 * j}% for 2M daily users"
+                         for j in range(5)]}
+            for i in range(roles)
+        ],
+        skills={"languages": "Python, Go, TypeScript, SQL", "frameworks": "FastAPI, React, Spark",
+                "cloud_devops": "AWS, GCP, Kubernetes, Terraform", "databases": "PostgreSQL, Redis, Snowflake"},
+        projects=[{"name": f"Project {i}", "tech_stack": "Python, Kafka",
+                   "bullets": [f"Open-source {THINGS[i % len(THINGS)]} used by 40 companies"]}
+                  for i in range(projects)],
+        education=[{"institution": "State University", "location": "Austin, TX",
+                    "degree": "B.S. Computer Science", "graduation_date": "2014"}],
+        certifications=[{"name": "AWS Certified Solutions Architect", "issuer": "Amazon", "year": "2021"}],
+    )
+    return render_resume_html(resume)
+
+
+def page_count(pdf: bytes) -> int:
+    from PyPDF2 import PdfReader
+    return len(PdfReader(io.BytesIO(pdf)).pages)
+
+
+def bench_inline(samples: dict[str, str], total: int) -> list[dict]:
+    from benchmarks.stats import StageResult
+    from resume_backend.services.pdf_renderer import _compile_sync
+
+    results = []
+    for label, html in samples.items():
+        result = StageResult(f"inline/{label}", 1)
+        started = time.perf_counter()
+        for _ in range(total):
+            begin = time.perf_counter()
+            _compile_sync(html)
+            result.latencies.append(time.perf_counter() - begin)
+        result.elapsed = time.perf_counter() - started
+        # Traced separately: tracemalloc slows rendering down several times
+        tracemalloc.start()
+        _compile_sync(html)
+        result.peak_mb = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+        tracemalloc.stop()
+        results.append(result.summary())
+    return results
+
+
+async def bench_pool(samples: dict[str, str], levels: list[int], total: int) -> list[dict]:
+    from benchmarks.stats import run_load
+    from resume_backend.services.pdf_renderer import html_to_pdf, render_pool
+
+    # Start every worker (and build its styles) outside the measurement
+    await asyncio.gather(*(html_to_pdf(html) for html in list(samples.values()) * render_pool.size))
+    results = []
+    for label, html in samples.items():
+        for level in levels:
+            # A trailing comment makes each HTML unique, as distinct results would be
+            async def one(i):
+                await html_to_pdf(html + f"<!-- {level}-{i} -->")
+            results.append((await run_load(f"pool/{label}", level, total, one)).summary())
+    render_pool.shutdown()
+    return results
+
+
+async def bench_cached(samples: dict[str, str], total: int) -> list[dict]:
+    from benchmarks.stats import run_load
+    from resume_backend.services import pdf_renderer
+    from resume_backend.services.cache import TieredCache
+
+    pdf_renderer.pdf_cache = TieredCache("pdf", max_bytes=64 * 1024 * 1024)
+    results = []
+    for label, html in samples.items():
+        await pdf_renderer.html_to_pdf(html)
+        results.append((await run_load(f"cached/{label}", 1, total,
+                                       lambda i: pdf_renderer.html_to_pdf(html))).summary())
+    pdf_renderer.render_pool.shutdown()
+    return results
+
+
+async def main(args):
+    from benchmarks.stats import print_table
+    from resume_backend.services.pdf_renderer import _compile_sync
+
+    samples = {"1-page": sample_html(roles=3, projects=0), "2-page": sample_html(roles=7, projects=3)}
+    for label, html in samples.items():
+        pdf = _compile_sync(html)
+        print(f"{label}: {len(html)} chars of HTML -> {len(pdf)} bytes, {page_count(pdf)} page(s)")
+
+    levels = [int(x) for x in args.concurrency.split(",")]
+    stages = args.stages.split(",")
+    rows = []
+    if "inline" in stages:
+        rows += bench_inline(samples, args.requests)
+    if "pool" in stages:
+        rows += await bench_pool(samples, levels, args.requests)
+    if "cached" in stages:
+        rows += await bench_cached(samples, args.requests)
+
+    print_table(rows)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stages", default="inline,pool,cached")
+    parser.add_argument("--concurrency", default="1,4", help="comma-separated concurrency levels for the pool stage")
+    parser.add_argument("--requests", type=int, default=40, help="renders per stage, sample and concurrency level")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+    configure_env()
+    asyncio.run(main(args))
@@ -0,0 +1,90 @@
+"""Many candidates tailored to one posting: single-phase vs two-phase (cached JD analysis).
+
+    cd backend
+    python -m benchmarks.bench_posting --candidates 40 --concurrency 4
+
+For a short and a long (careers-page) posting, generate_optimized_html runs once per
+candidate resume against the fake provider, with the result cache off:
+  single     JD_ANALYSIS_ENABLED=false: the raw (compacted) JD goes into every rewrite prompt
+  two-phase  JD_ANALYSIS_ENABLED=true, analysis cache empty at the start: the first
+             candidates wait for the one analysis call, everyone else reuses it
+
+The fake model's time to first token grows with the prompt at --prefill tokens/sec, so
+shorter prompts show up in latency. tokens_in is prompt tokens per candidate, analysis
+call included.
+"""
+import argparse
+import asyncio
+import json
+import os
+
+
+def configure_env(args):
+    # Must run before resume_backend is imported: Settings reads the environment once
+    os.environ.update({
+        "LLM_PROVIDER": "fake",
+        "FAKE_LLM_TTFT_SECONDS": str(args.ttft),
+        "FAKE_LLM_TOKENS_PER_SECOND": str(args.tokens_per_second),
+        "FAKE_LLM_PREFILL_TOKENS_PER_SECOND": str(args.prefill),
+        "GROQ_REQUESTS_PER_MINUTE": "1000000",
+        "GROQ_TOKENS_PER_MINUTE": "1000000000",
+        "GROQ_MAX_CONCURRENCY": "1000",
+        "RESULT_CACHE_MAX_MB": "0",
+        "RESULT_CACHE_DB_PATH": "",
+        "JD_ANALYSIS_CACHE_DB_PATH": "",
+    })
+
+
+async def bench_mode(mode: str, label: str, job_description: str, resumes: list[str], concurrency: int) -> dict:
+    from benchmarks.stats import run_load
+    from resume_backend.core.config import settings
+    from resume_backend.core.metrics import llm_tokens
+    from resume_backend.services import llm_chain
+    from resume_backend.services.cache import TieredCache
+
+    settings.JD_ANALYSIS_ENABLED = mode == "two-phase"
+    llm_chain.jd_analysis_cache = TieredCache("jd_analysis", max_bytes=16 * 1024 * 1024)
+    tokens_before = llm_tokens.value("in")
+    result = await run_load(f"{mode}/{label}", concurrency, len(resumes),
+                            lambda i: llm_chain.generate_optimized_html(resumes[i], job_description))
+    row = result.summary()
+    row["tokens_in"] = round((llm_tokens.value("in") - tokens_before) / len(resumes))
+    # One cache entry per analysis generated
+    row["analysis_calls"] = llm_chain.jd_analysis_cache.stats()["entries"]
+    return row
+
+
+async def main(args):
+    from benchmarks.corpus import JOB_DESCRIPTIONS, LONG_JOB_DESCRIPTION, resume_lines
+    from benchmarks.stats import print_table
+    from resume_backend.services import llm_chain
+
+    llm_chain.warm_up()
+    resumes = ["\n".join(resume_lines(seed, 4)) for seed in range(args.candidates)]
+    postings = {"short": JOB_DESCRIPTIONS[0], "long": LONG_JOB_DESCRIPTION}
+    rows = []
+    for label, job_description in postings.items():
+        for mode in ("single", "two-phase"):
+            rows.append(await bench_mode(mode, label, job_description, resumes, args.concurrency))
+
+    print_table(rows)
+    print()
+    for row in rows:
+        print(f"{row['stage']:>16}: {row['tokens_in']} prompt tokens per candidate, "
+              f"{row['analysis_calls']} analysis call(s)")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--candidates", type=int, default=40, help="resumes tailored to each posting")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--ttft", type=float, default=0.2, help="fake LLM base time to first token (s)")
+    parser.add_argument("--prefill", type=float, default=2000.0, help="fake LLM prompt tokens/sec before the first token")
+    parser.add_argument("--tokens-per-second", type=float, default=500.0, help="fake LLM generation speed")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+    configure_env(args)
+    asyncio.run(main(args))
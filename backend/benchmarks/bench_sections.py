@@ -0,0 +1,107 @@
+"""Section-parallel generation vs the single-call paths, by resume length.
+
+    cd backend
+    python -m benchmarks.bench_sections --roles 2,4,8,12 --requests 5
+
+Each resume (--roles experience blocks) is generated --requests times, one at a time,
+against the fake provider with the result cache off, in every GENERATION_MODE:
+  html      one call, the model streams the whole styled HTML
+  json      one call, the model returns the whole resume schema; Jinja renders it
+  sections  one call per section (profile, each role, projects, education), up to
+            SECTION_MAX_CONCURRENCY in flight; the parts are merged and rendered
+
+sections/unmarked runs the same resume with its bullet glyphs stripped, as
+python-docx extracts DOCX lists; it should split into the same number of calls.
+
+calls, tokens_in and tokens_out are per resume; every section call repeats the
+system prompt, so sections trades prompt tokens for wall-clock time.
+"""
+import argparse
+import asyncio
+import json
+import os
+
+
+def configure_env(args):
+    # Must run before resume_backend is imported: Settings reads the environment once
+    os.environ.update({
+        "LLM_PROVIDER": "fake",
+        "FAKE_LLM_TTFT_SECONDS": str(args.ttft),
+        "FAKE_LLM_TOKENS_PER_SECOND": str(args.tokens_per_second),
+        "GROQ_REQUESTS_PER_MINUTE": "1000000",
+        "GROQ_TOKENS_PER_MINUTE": "1000000000",
+        "GROQ_MAX_CONCURRENCY": "1000",
+        "SECTION_MAX_CONCURRENCY": str(args.section_concurrency),
+        "RESULT_CACHE_MAX_MB": "0",
+        "RESULT_CACHE_DB_PATH": "",
+        "JD_ANALYSIS_CACHE_DB_PATH": "",
+    })
+
+
+async def bench_mode(mode: str, label: str, resume: str, job_description: str, args) -> dict:
+    from benchmarks.stats import run_load
+    from resume_backend.core.config import settings
+    from resume_backend.core.metrics import llm_tokens
+    from resume_backend.services import llm_chain
+
+    settings.GENERATION_MODE = mode
+    before = {direction: llm_tokens.value(direction) for direction in ("in", "out")}
+    calls_before = _llm_calls()
+    result = await run_load(label, 1, args.requests,
+                            lambda i: llm_chain.generate_optimized_html(resume, job_description))
+    row = result.summary()
+    row["calls"] = round((_llm_calls() - calls_before) / args.requests, 1)
+    for direction in ("in", "out"):
+        row[f"tokens_{direction}"] = round((llm_tokens.value(direction) - before[direction]) / args.requests)
+    return row
+
+
+def _llm_calls() -> int:
+    # Rewrite calls so far: whole-resume ("llm_total") and per-section ("section_total")
+    from resume_backend.core.metrics import stage_seconds
+
+    return stage_seconds.count("llm_total") + stage_seconds.count("section_total")
+
+
+async def main(args):
+    from benchmarks.corpus import JOB_DESCRIPTIONS, resume_lines
+    from benchmarks.stats import print_table
+    from resume_backend.core.config import settings
+    from resume_backend.services import llm_chain
+    from resume_backend.services.compaction import compact_job_description
+
+    llm_chain.warm_up()
+    # Every mode then gets the JD analysis from the cache
+    if settings.JD_ANALYSIS_ENABLED:
+        await llm_chain.analyze_job_description(compact_job_description(JOB_DESCRIPTIONS[0]).text)
+    rows = []
+    for roles in [int(r) for r in args.roles.split(",")]:
+        resume = "\n".join(resume_lines(roles, roles))
+        for mode in ("html", "json", "sections"):
+            rows.append(await bench_mode(mode, f"{mode}/{roles} roles", resume, JOB_DESCRIPTIONS[0], args))
+        unmarked = "\n".join(resume_lines(roles, roles, bullet=""))
+        rows.append(await bench_mode("sections", f"sections/unmarked/{roles} roles", unmarked,
+                                     JOB_DESCRIPTIONS[0], args))
+
+    print_table(rows)
+    print()
+    for row in rows:
+        print(f"{row['stage']:>25}: {row['calls']} call(s), {row['tokens_in']} tokens in, "
+              f"{row['tokens_out']} tokens out")
+    print(f"\nSECTION_MAX_CONCURRENCY={settings.SECTION_MAX_CONCURRENCY}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--roles", default="2,4,8,12", help="comma-separated experience blocks per resume")
+    parser.add_argument("--requests", type=int, default=5, help="resumes generated per mode and length")
+    parser.add_argument("--section-concurrency", type=int, default=4, help="SECTION_MAX_CONCURRENCY")
+    parser.add_argument("--ttft", type=float, default=0.3, help="fake LLM time to first token (s)")
+    parser.add_argument("--tokens-per-second", type=float, default=250.0, help="fake LLM generation speed")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+    configure_env(args)
+    asyncio.run(main(args))
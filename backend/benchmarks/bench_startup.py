@@ -0,0 +1,106 @@
+"""Cold-start benchmark: import time, time to ready and first-request latency.
+
+    cd backend
+    python -m benchmarks.bench_startup --runs 5
+
+Measured, median over --runs fresh processes (fake LLM provider, caches off):
+  import   import resume_backend.main in a new interpreter
+  listen   uvicorn spawned -> GET / answers
+  ready    uvicorn spawned -> GET /ready answers 200 (same as listen without /ready)
+  first    first POST /api/optimize, sent as soon as the server is ready
+  second   the next POST /api/optimize (different job description, so no cache hit)
+  pdf      first POST /api/optimize/pdf
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+IMPORT_SNIPPET = "import time; t = time.perf_counter(); import resume_backend.main; print(time.perf_counter() - t)"
+
+
+def configure_env(args):
+    from benchmarks.bench_optimize import configure_env as configure_optimize_env
+
+    configure_optimize_env(argparse.Namespace(ttft=args.ttft, tokens_per_second=args.tokens_per_second, error_rate=0.0))
+    os.environ.update({"PDF_CACHE_MAX_MB": "0", "PDF_CACHE_DB_PATH": ""})
+
+
+def measure_import() -> float:
+    output = subprocess.run([sys.executable, "-c", IMPORT_SNIPPET], env=os.environ.copy(), check=True,
+                            capture_output=True, text=True).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+async def _poll(client, url: str, started: float, timeout: float = 60.0) -> tuple[float, int]:
+    while time.perf_counter() - started < timeout:
+        try:
+            response = await client.get(url)
+            if response.status_code in (200, 404):
+                return time.perf_counter() - started, response.status_code
+        except Exception:
+            pass
+        await asyncio.sleep(0.01)
+    raise RuntimeError(f"{url} did not answer within {timeout:g}s")
+
+
+async def measure_server() -> dict:
+    import httpx
+    from benchmarks.bench_optimize import _free_port
+    from benchmarks.corpus import JOB_DESCRIPTIONS, build_corpus
+
+    filename, data, content_type = build_corpus()[0]
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}"
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "resume_backend.main:app", "--port", str(port), "--log-level", "warning"],
+        env=os.environ.copy(),
+    )
+    result = {}
+    try:
+        async with httpx.AsyncClient(timeout=300) as client:
+            result["listen"], _ = await _poll(client, url + "/", started)
+            ready, status = await _poll(client, url + "/ready", started)
+            result["ready"] = ready if status == 200 else result["listen"]
+
+            async def post(path: str, i: int) -> float:
+                begin = time.perf_counter()
+                response = await client.post(url + path, files={"resume": (filename, data, content_type)},
+                                             data={"job_description": JOB_DESCRIPTIONS[i % len(JOB_DESCRIPTIONS)]})
+                response.raise_for_status()
+                return time.perf_counter() - begin
+
+            result["first"] = await post("/api/optimize", 0)
+            result["second"] = await post("/api/optimize", 1)
+            result["pdf"] = await post("/api/optimize/pdf", 2)
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+    return result
+
+
+async def main(args):
+    runs = [{"import": measure_import(), **await measure_server()} for _ in range(args.runs)]
+    summary = {name: round(statistics.median(run[name] for run in runs) * 1000, 1) for name in runs[0]}
+    print(f"median over {args.runs} runs, ms")
+    for name, ms in summary.items():
+        print(f"  {name:<8}{ms:>10.1f}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"runs": runs, "median_ms": summary}, f, indent=2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="fresh processes to measure")
+    parser.add_argument("--ttft", type=float, default=0.05, help="fake LLM time to first token (s)")
+    parser.add_argument("--tokens-per-second", type=float, default=100000.0, help="fake LLM generation speed")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+    configure_env(args)
+    asyncio.run(main(args))
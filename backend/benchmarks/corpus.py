@@ -0,0 +1,123 @@
+import io
+import random
+from docx import Document
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfgen import canvas
+
+# Synthetic but realistic-looking resumes and postings, generated on the fly
+# so no binary fixtures live in the repo.
+
+SKILLS = ["Python", "Go", "TypeScript", "React", "FastAPI", "PostgreSQL", "Redis", "Kafka", "AWS", "GCP",
+          "Kubernetes", "Terraform", "Docker", "CI/CD", "GraphQL", "gRPC", "Spark", "Airflow", "Snowflake"]
+VERBS = ["Built", "Led", "Designed", "Migrated", "Automated", "Scaled", "Owned", "Optimized", "Launched"]
+THINGS = ["billing pipeline", "search service", "data platform", "mobile API", "deployment tooling",
+          "observability stack", "recommendation engine", "onboarding flow", "ETL jobs", "auth service"]
+
+JOB_DESCRIPTIONS = [
+    "Senior Backend Engineer. You will design and scale distributed services in Python and Go, own our "
+    "Kubernetes-based platform on AWS, mentor engineers and drive reliability (SLOs, on-call, incident reviews). "
+    "Requirements: 5+ years backend experience, PostgreSQL, Kafka, Terraform, CI/CD. We are an equal opportunity "
+    "employer. Benefits include health insurance, 401(k) match and unlimited PTO.",
+    "Data Engineer. Build batch and streaming pipelines with Spark, Airflow and Snowflake; model data for analytics; "
+    "partner with product and finance on metrics. Requirements: SQL, Python, dbt, cloud data warehouses, data quality "
+    "tooling. Nice to have: Kafka, GCP.",
+    "Full Stack Engineer (React/TypeScript). Ship customer-facing features end to end, from GraphQL APIs to polished "
+    "React UIs; collaborate with design; write tests; improve web performance. Requirements: 3+ years React, "
+    "TypeScript, Node or Python backends, REST/GraphQL.",
+]
+
+# A posting as pasted from a careers page: company blurb, role, requirements, benefits, EEO
+LONG_JOB_DESCRIPTION = """About us
+Acme Cloud builds the payments infrastructure behind thousands of online businesses. Since 2015 we have grown
+to 900 people across four continents, processing over $40B a year. Our mission is to make moving money as easy
+as sending an email. We are backed by leading investors and profitable since 2021.
+
+The role: Staff Software Engineer, Payments Platform
+As a Staff Software Engineer you will lead the design and evolution of the services that authorize, capture and
+settle card payments. You will own the architecture of a platform handling 20,000 requests per second at
+99.99% availability, set technical direction across three teams, and mentor senior engineers.
+
+What you will do
+- Architect and scale distributed, event-driven services in Go and Python on Kubernetes (AWS)
+- Own reliability: define SLOs, lead incident reviews, drive capacity planning and chaos testing
+- Design data models and migrations for PostgreSQL and DynamoDB at high write volume
+- Build streaming pipelines with Kafka for ledgering, reconciliation and fraud signals
+- Partner with product, risk and compliance (PCI DSS, SOC 2) on roadmap and trade-offs
+- Raise the bar on code review, testing strategy, observability (OpenTelemetry, Prometheus, Grafana) and CI/CD
+- Mentor engineers and lead architecture reviews and design docs
+
+What you bring
+- 8+ years building backend systems, 3+ years in a staff or tech lead role
+- Deep experience with Go or Python, gRPC and REST APIs, and distributed systems fundamentals
+- Production experience with Kubernetes, Terraform and AWS (EKS, RDS, SQS, Lambda)
+- Experience with payments, ledgers or other financial systems where correctness matters
+- Strong written communication; you enjoy writing design docs and growing other engineers
+
+Nice to have
+- Card network integrations (Visa, Mastercard), ISO 8583, 3-D Secure
+- Experience with Rust, Temporal, or event sourcing
+
+What we offer
+Benefits include medical, dental and vision coverage for you and your dependents. 401(k) with 4% match.
+Unlimited PTO and 16 weeks of paid parental leave. A $2,000 yearly learning budget and a home office stipend.
+Wellness stipend and commuter benefits.
+
+Acme Cloud is an equal opportunity employer. We celebrate diversity and are committed to creating an inclusive
+environment for all employees. All qualified applicants will receive consideration for employment without regard
+to race, color, religion, sex, sexual orientation, gender identity, national origin, disability or veteran status.
+We provide reasonable accommodations for candidates with disabilities. Employment is contingent on a background check.
+"""
+
+
+def resume_lines(seed: int, roles: int, bullet: str = "• ") -> list[str]:
+    # bullet="" gives the unmarked bullets of DOCX text, whose list glyphs python-docx drops
+    rng = random.Random(seed)
+    lines = [f"Candidate {seed}", f"candidate{seed}@example.com | (555) 010-{seed:04d} | Austin, TX", "",
+             "SUMMARY",
+             f"Software engineer with {roles * 2} years of experience in {', '.join(rng.sample(SKILLS, 4))}.", "",
+             "EXPERIENCE"]
+    for role in range(roles):
+        lines.append(f"Company {seed}-{role} — Software Engineer — {2024 - 2 * role - 2}–{2024 - 2 * role}")
+        for _ in range(rng.randint(4, 6)):
+            lines.append(f"{bullet}{rng.choice(VERBS)} the {rng.choice(THINGS)} using {rng.choice(SKILLS)} and "
+                         f"{rng.choice(SKILLS)}, cutting latency by {rng.randint(10, 70)}%")
+        lines.append("")
+    lines += ["SKILLS", ", ".join(rng.sample(SKILLS, 10)), "", "EDUCATION", "State University — B.S. Computer Science — 2014"]
+    return lines
+
+
+def make_pdf(lines: list[str]) -> bytes:
+    buffer = io.BytesIO()
+    pdf = canvas.Canvas(buffer, pagesize=letter)
+    y = 750
+    for line in lines:
+        if y < 50:
+            pdf.showPage()
+            y = 750
+        pdf.drawString(50, y, line[:110])
+        y -= 14
+    pdf.save()
+    return buffer.getvalue()
+
+
+def make_docx(lines: list[str]) -> bytes:
+    doc = Document()
+    for line in lines:
+        doc.add_paragraph(line)
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+PDF = "application/pdf"
+DOCX = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+
+def build_corpus() -> list[tuple[str, bytes, str]]:
+    # (filename, bytes, content type): one- and two-page PDFs plus DOCX files
+    corpus = []
+    for seed, roles in enumerate([2, 3, 4, 6, 8]):
+        lines = resume_lines(seed, roles)
+        corpus.append((f"resume-{seed}.pdf", make_pdf(lines), PDF))
+        corpus.append((f"resume-{seed}.docx", make_docx(lines), DOCX))
+    return corpus
@@ -0,0 +1,110 @@
+import asyncio
+import os
+import resource
+import time
+from dataclasses import dataclass, field
+
+
+def percentile(values: list[float], p: float) -> float:
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * p / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def _rss_kb(pid: int) -> int:
+    # Resident memory of pid plus all of its descendants (Linux /proc)
+    total = 0
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    total += int(line.split()[1])
+        for task in os.listdir(f"/proc/{pid}/task"):
+            with open(f"/proc/{pid}/task/{task}/children") as f:
+                total += sum(_rss_kb(int(child)) for child in f.read().split())
+    except (FileNotFoundError, ProcessLookupError, PermissionError):
+        pass
+    return total
+
+
+class MemorySampler:
+    # Samples RSS of a process tree in the background and keeps the peak
+    def __init__(self, pid: int | None = None, interval: float = 0.05):
+        self.pid = pid or os.getpid()
+        self.interval = interval
+        self.peak_kb = 0
+        self._task: asyncio.Task | None = None
+
+    async def _run(self):
+        while True:
+            self.peak_kb = max(self.peak_kb, _rss_kb(self.pid))
+            await asyncio.sleep(self.interval)
+
+    async def __aenter__(self):
+        self._task = asyncio.create_task(self._run())
+        return self
+
+    async def __aexit__(self, *exc):
+        self._task.cancel()
+        self.peak_kb = max(self.peak_kb, _rss_kb(self.pid))
+        if not self.peak_kb and self.pid == os.getpid():
+            self.peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+@dataclass
+class StageResult:
+    stage: str
+    concurrency: int
+    latencies: list[float] = field(default_factory=list)
+    errors: int = 0
+    elapsed: float = 0.0
+    peak_mb: float = 0.0
+
+    def summary(self) -> dict:
+        ms = [x * 1000 for x in self.latencies]
+        return {
+            "stage": self.stage,
+            "concurrency": self.concurrency,
+            "requests": len(self.latencies) + self.errors,
+            "errors": self.errors,
+            "p50_ms": round(percentile(ms, 50), 1),
+            "p95_ms": round(percentile(ms, 95), 1),
+            "p99_ms": round(percentile(ms, 99), 1),
+            "rps": round(len(self.latencies) / self.elapsed, 2) if self.elapsed else 0.0,
+            "peak_mb": round(self.peak_mb, 1),
+        }
+
+
+async def run_load(stage: str, concurrency: int, total: int, fn, memory_pid: int | None = None) -> StageResult:
+    # Calls fn(i) total times with at most concurrency calls in flight
+    result = StageResult(stage, concurrency)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                await fn(i)
+            except Exception:
+                result.errors += 1
+            else:
+                result.latencies.append(time.perf_counter() - started)
+
+    async with MemorySampler(memory_pid) as memory:
+        started = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(total)))
+        result.elapsed = time.perf_counter() - started
+    result.peak_mb = memory.peak_kb / 1024
+    return result
+
+
+def print_table(rows: list[dict]):
+    columns = ["stage", "concurrency", "requests", "errors", "p50_ms", "p95_ms", "p99_ms", "rps", "peak_mb"]
+    widths = {c: max(len(c), *(len(str(r[c])) for r in rows)) for c in columns}
+    print("  ".join(c.rjust(widths[c]) for c in columns))
+    for row in rows:
+        print("  ".join(str(row[c]).rjust(widths[c]) for c in columns))
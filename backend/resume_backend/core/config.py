@@ -1,9 +1,131 @@
+from typing import Literal
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
-    GROQ_API_KEY: str
+    # "groq" calls the Groq API; "fake" is a local deterministic model for offline runs and benchmarks
+    LLM_PROVIDER: Literal["groq", "fake"] = "groq"
+    GROQ_API_KEY: str = ""
     GROQ_MODEL: str = "llama-3.3-70b-versatile"
+    # Client-side limits; set the quotas to your Groq account's limits for GROQ_MODEL
+    GROQ_REQUESTS_PER_MINUTE: int = 30
+    GROQ_TOKENS_PER_MINUTE: int = 60000
+    GROQ_MAX_CONCURRENCY: int = 8
+    GROQ_QUEUE_TIMEOUT_SECONDS: float = 10.0
+    GROQ_MAX_RETRIES: int = 3
+    GROQ_COMPLETION_TOKENS_ESTIMATE: int = 3000
+    # Keep-alive pool to the Groq API (GROQ_MAX_CONCURRENCY connections); warm-up opens
+    # GROQ_WARM_CONNECTIONS of them before the first request
+    GROQ_WARM_CONNECTIONS: int = 2
+    GROQ_KEEPALIVE_SECONDS: float = 120.0
+
+    # Latency profile of the fake provider
+    FAKE_LLM_TTFT_SECONDS: float = 0.4
+    FAKE_LLM_TOKENS_PER_SECOND: float = 500.0
+    FAKE_LLM_PREFILL_TOKENS_PER_SECOND: float = 0.0
+    FAKE_LLM_ERROR_RATE: float = 0.0
+    FAKE_LLM_SEED: int = 0
     MAX_FILE_SIZE_MB: int = 10
+    # Allowance on top of the file for the other form fields and multipart framing
+    MAX_FORM_OVERHEAD_MB: int = 2
+
+    # "html": the model writes the full styled HTML. "json": the model returns a compact
+    # resume schema and the backend renders templates/resume.html.j2 with Jinja2.
+    # "sections": like json, but one call per section (profile, each role, projects,
+    # education) with up to SECTION_MAX_CONCURRENCY per request in flight, each capped
+    # at SECTION_MAX_TOKENS. Faster for long resumes; uses more requests per minute.
+    GENERATION_MODE: Literal["html", "json", "sections"] = "html"
+    SECTION_MAX_CONCURRENCY: int = 4
+    SECTION_MAX_TOKENS: int = 1500
+
+    # Leftover {{PLACEHOLDER}}s in generated HTML are always blanked. With COMPACT_HTML its
+    # repeated inline styles are moved into one <style> block and whitespace is collapsed
+    # (renders the same).
+    # Responses of at least COMPRESSION_MIN_BYTES (0 = off) are gzip- or brotli-compressed
+    # when the client accepts it (brotli needs the brotli or brotlicffi package); streams never are.
+    COMPACT_HTML: bool = True
+    COMPRESSION_MIN_BYTES: int = 1024
+    GZIP_LEVEL: int = 6
+    BROTLI_QUALITY: int = 5
+
+    # /api/optimize/batch: one resume against many job descriptions
+    BATCH_MAX_ITEMS: int = 50
+    BATCH_CONCURRENCY: int = 4
+
+    # Document parsing runs in a separate process pool to keep the event loop free
+    PARSER_POOL_SIZE: int = 2
+    PARSER_TIMEOUT_SECONDS: float = 30.0
+    PARSER_QUEUE_LIMIT: int = 16
+
+    # PDF rendering (/api/optimize/pdf) runs in its own process pool; output is cached by HTML hash
+    RENDER_POOL_SIZE: int = 2
+    RENDER_TIMEOUT_SECONDS: float = 30.0
+    RENDER_QUEUE_LIMIT: int = 16
+    PDF_CACHE_MAX_MB: int = 64
+    PDF_CACHE_TTL_SECONDS: int = 24 * 60 * 60
+    PDF_CACHE_DB_PATH: str = ""
+    PDF_CACHE_MAX_DISK_MB: int = 512
+
+    # Resume text budget: the parser stops extracting once it has this much (whole pages,
+    # at most PARSE_MAX_PAGES; RESUME_MAX_TOKENS counts as ~4 characters per token there).
+    # PDFs with PARSE_PARALLEL_MIN_PAGES or more pages (0 = never) are split across the
+    # parser pool workers.
+    RESUME_MAX_CHARS: int = 50000
+    RESUME_MAX_TOKENS: int = 12500
+    PARSE_MAX_PAGES: int = 30
+    PARSE_PARALLEL_MIN_PAGES: int = 0
+
+    # Prompt compaction. After cleanup the resume is cut to RESUME_MAX_TOKENS and the job
+    # description to JD_MAX_TOKENS, counted with this tiktoken encoding (not Groq's own
+    # tokenizer, but close for English). Empty, or tiktoken unavailable: ~4 chars/token.
+    JD_MAX_TOKENS: int = 5000
+    TOKENIZER_ENCODING: str = "cl100k_base"
+
+    # Two-phase generation: each posting is analyzed once (skills, responsibilities,
+    # terminology; at most JD_ANALYSIS_MAX_TOKENS) and the rewrite prompt gets that
+    # analysis instead of the raw JD. Analyses are cached by normalized JD hash. Off by
+    # default: it only pays off when many resumes target one long posting; otherwise it
+    # adds a serial LLM call per posting and the rewrite only sees the summary.
+    JD_ANALYSIS_ENABLED: bool = False
+    JD_ANALYSIS_MAX_TOKENS: int = 400
+    JD_ANALYSIS_CACHE_MAX_MB: int = 16
+    JD_ANALYSIS_TTL_SECONDS: int = 7 * 24 * 60 * 60
+    JD_ANALYSIS_CACHE_DB_PATH: str = ""
+    JD_ANALYSIS_CACHE_MAX_DISK_MB: int = 64
+
+    # Parsed resumes are cached by content hash; set PARSE_CACHE_DB_PATH to add a SQLite tier
+    # of at most PARSE_CACHE_MAX_DISK_MB
+    PARSE_CACHE_MAX_MB: int = 64
+    PARSE_CACHE_TTL_SECONDS: int = 7 * 24 * 60 * 60
+    PARSE_CACHE_DB_PATH: str = ""
+    PARSE_CACHE_MAX_DISK_MB: int = 256
+
+    # Generated HTML is cached per (resume, JD, options, model, prompt version)
+    RESULT_CACHE_MAX_MB: int = 128
+    RESULT_CACHE_TTL_SECONDS: int = 24 * 60 * 60
+    RESULT_CACHE_DB_PATH: str = ""
+    RESULT_CACHE_MAX_DISK_MB: int = 1024
+
+    # Async job mode (/api/jobs). Every uvicorn worker runs JOBS_WORKERS consumers
+    # against the same SQLite file, so it must be on storage they all share.
+    JOBS_DB_PATH: str = ".cache/jobs.sqlite3"
+    JOBS_WORKERS: int = 2
+    JOBS_MAX_QUEUED: int = 200
+    JOBS_LEASE_SECONDS: float = 60.0
+    JOBS_MAX_ATTEMPTS: int = 3
+    JOBS_POLL_INTERVAL_SECONDS: float = 1.0
+    JOBS_RETENTION_HOURS: int = 24
+
+    # Load LangChain, the model client and the pool worker processes at startup, in the
+    # background; /ready answers 503 until that is done. Off: everything loads on first use.
+    WARM_UP_ON_STARTUP: bool = True
+
+    # Observability. DEBUG_LOG_CONTENT logs full resumes and generated HTML (costly at
+    # volume). Profiling samples PROFILE_SAMPLE_RATE of requests with cProfile, plus any
+    # request sent with "X-Profile: 1" when PROFILE_ON_HEADER is set.
+    DEBUG_LOG_CONTENT: bool = False
+    PROFILE_SAMPLE_RATE: float = 0.0
+    PROFILE_ON_HEADER: bool = False
+    PROFILE_DIR: str = ".cache/profiles"
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,12 @@
+class ServiceBusyError(RuntimeError):
+    # Raised when a bounded resource is saturated; routers turn it into a 503 with Retry-After
+    def __init__(self, message: str, retry_after: int = 1):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class UploadError(RuntimeError):
+    # Raised while ingesting an upload; carries the HTTP status the router should return
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
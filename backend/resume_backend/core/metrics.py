@@ -0,0 +1,132 @@
+import math
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Stage timings of the request being handled, filled in by timed()/observe_stage()
+# and sent back as a Server-Timing header by ServerTimingMiddleware
+request_timings: ContextVar[dict[str, float] | None] = ContextVar("request_timings", default=None)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, math.inf)
+RATE_BUCKETS = (10, 25, 50, 100, 200, 400, 800, 1600, math.inf)
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._values: dict[tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def inc(self, amount: float = 1.0, *labels: str):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        with self._lock:
+            return self._values.get(labels, 0.0)
+
+    def expose(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labels, labels)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = (), buckets: tuple = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        # labels -> [count per bucket..., sum, count]
+        self._values: dict[tuple[str, ...], list[float]] = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def observe(self, value: float, *labels: str):
+        with self._lock:
+            series = self._values.setdefault(labels, [0.0] * (len(self.buckets) + 2))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def count(self, *labels: str) -> int:
+        with self._lock:
+            series = self._values.get(labels)
+            return int(series[-1]) if series else 0
+
+    def expose(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for labels, series in sorted(self._values.items()):
+                for bound, count in zip(self.buckets, series):
+                    le = f'le="{_format_value(bound)}"'
+                    lines.append(f"{self.name}_bucket{_format_labels(self.labels, labels, le)} {_format_value(count)}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labels, labels)} {_format_value(series[-2])}")
+                lines.append(f"{self.name}_count{_format_labels(self.labels, labels)} {_format_value(series[-1])}")
+        return lines
+
+
+REGISTRY: list[Counter | Histogram] = []
+
+http_requests = Counter("resume_http_requests_total", "HTTP requests by route and status.", ("route", "status"))
+http_request_seconds = Histogram("resume_http_request_seconds", "HTTP request duration by route.", ("route",))
+stage_seconds = Histogram("resume_stage_seconds", "Time spent per pipeline stage.", ("stage",))
+llm_tokens = Counter("resume_llm_tokens_total", "LLM tokens, by direction (in = prompt, out = completion).",
+                     ("direction",))
+prompt_tokens_saved = Counter("resume_prompt_tokens_saved_total", "Prompt tokens removed by compaction.")
+html_placeholders = Counter("resume_html_placeholders_total", "Leftover {{PLACEHOLDER}}s blanked in generated HTML.")
+html_bytes_saved = Counter("resume_html_bytes_saved_total", "Generated HTML bytes removed by compaction.")
+response_bytes_saved = Counter("resume_response_bytes_saved_total", "Response bytes saved by compression.",
+                               ("encoding",))
+llm_tokens_per_second = Histogram("resume_llm_tokens_per_second", "LLM completion tokens per second after the "
+                                  "first token.", buckets=RATE_BUCKETS)
+
+
+def observe_stage(stage: str, seconds: float):
+    stage_seconds.observe(seconds, stage)
+    timings = request_timings.get()
+    if timings is not None:
+        timings[stage] = timings.get(stage, 0.0) + seconds
+
+
+@contextmanager
+def timed(stage: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(stage, time.perf_counter() - started)
+
+
+def render_metrics() -> str:
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.expose())
+    return "\n".join(lines) + "\n"
+
+
+def server_timing_header(timings: dict[str, float], total: float) -> str:
+    entries = [f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in timings.items()]
+    entries.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(entries)
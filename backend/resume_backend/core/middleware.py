@@ -0,0 +1,241 @@
+import cProfile
+import gzip
+import logging
+import os
+import random
+import time
+from functools import lru_cache
+from starlette.datastructures import MutableHeaders
+from starlette.exceptions import HTTPException
+from starlette.responses import PlainTextResponse
+from resume_backend.core.metrics import (http_request_seconds, http_requests, request_timings,
+                                         response_bytes_saved, server_timing_header, timed)
+
+logger = logging.getLogger(__name__)
+
+
+class _BodyTooLarge(HTTPException):
+    # An HTTPException so FastAPI's body parsing re-raises it as-is instead of turning it into a 400
+    def __init__(self):
+        super().__init__(413, "Request body too large.")
+
+
+class RequestSizeLimitMiddleware:
+    # Rejects request bodies over max_bytes with 413 before they are buffered:
+    # immediately when Content-Length says so, otherwise as soon as the streamed
+    # body crosses the limit (chunked uploads, lying clients).
+
+    def __init__(self, app, max_bytes: int):
+        self.app = app
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        headers = dict(scope["headers"])
+        content_length = headers.get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > self.max_bytes:
+            return await self._reject(scope, receive, send)
+
+        received = 0
+        response_started = False
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    raise _BodyTooLarge()
+            return message
+
+        async def tracking_send(message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, tracking_send)
+        except _BodyTooLarge:
+            if response_started:
+                raise
+            await self._reject(scope, receive, send)
+
+    async def _reject(self, scope, receive, send):
+        response = PlainTextResponse("Request body too large.", status_code=413, headers={"Connection": "close"})
+        await response(scope, receive, send)
+
+
+COMPRESSIBLE_TYPES = ("text/html", "text/plain", "text/css", "application/json", "application/javascript",
+                      "image/svg+xml")
+
+
+@lru_cache(maxsize=1)
+def _brotli():
+    # Optional: either the brotli or the brotlicffi package. Without one, gzip only.
+    for name in ("brotli", "brotlicffi"):
+        try:
+            return __import__(name)
+        except ImportError:
+            pass
+    return None
+
+
+def negotiate_encoding(accept_encoding: str) -> str | None:
+    # "br" or "gzip", whichever the client weights highest (br on a tie), or None
+    weights = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        weight = 1.0
+        if params.strip().startswith("q="):
+            try:
+                weight = float(params.strip()[2:])
+            except ValueError:
+                weight = 0.0
+        weights[name.strip()] = weight
+    wildcard = weights.get("*", 0.0)
+    candidates = [("br", weights.get("br", wildcard))] if _brotli() is not None else []
+    candidates.append(("gzip", weights.get("gzip", wildcard)))
+    encoding, weight = max(candidates, key=lambda candidate: candidate[1])
+    return encoding if weight > 0 else None
+
+
+class CompressionMiddleware:
+    # Compresses whole responses (JSON, HTML, text) with brotli or gzip, as the
+    # client's Accept-Encoding allows. Only responses sent as one body are touched:
+    # streams (SSE, NDJSON, PDF chunks) pass through as they are, since compressing
+    # them would hold chunks back until the compressor had enough to emit. Whether a
+    # response can be compressed is decided from its start message where possible,
+    # so stream headers are never held back waiting for the first chunk.
+
+    def __init__(self, app, minimum_size: int, gzip_level: int, brotli_quality: int):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        encoding = negotiate_encoding(dict(scope["headers"]).get(b"accept-encoding", b"").decode("latin-1"))
+        if encoding is None:
+            return await self.app(scope, receive, send)
+
+        start = None
+
+        async def compressing_send(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                if not self._compressible_start(message):
+                    # Streams (SSE, NDJSON, PDF) and small or already-encoded responses:
+                    # headers go out now, so time to first byte is unchanged
+                    return await send(message)
+                # Held until the first body message shows whether the response streams
+                start = message
+                return
+            if message["type"] != "http.response.body" or start is None:
+                return await send(message)
+
+            held, start = start, None
+            body = message.get("body", b"")
+            if message.get("more_body") or len(body) < self.minimum_size:
+                await send(held)
+                return await send(message)
+
+            with timed("compress"):
+                if encoding == "br":
+                    compressed = _brotli().compress(body, quality=self.brotli_quality)
+                else:
+                    compressed = gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+            response_bytes_saved.inc(len(body) - len(compressed), encoding)
+            headers = MutableHeaders(raw=held["headers"])
+            headers["content-encoding"] = encoding
+            headers["content-length"] = str(len(compressed))
+            headers.add_vary_header("Accept-Encoding")
+            await send(held)
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, compressing_send)
+
+    def _compressible_start(self, message) -> bool:
+        headers = MutableHeaders(raw=list(message.get("headers", [])))
+        content_type = headers.get("content-type", "").split(";")[0].strip().lower()
+        content_length = headers.get("content-length", "")
+        if content_length.isdigit() and int(content_length) < self.minimum_size:
+            return False
+        return (message["status"] not in (204, 304) and "content-encoding" not in headers
+                and content_type in COMPRESSIBLE_TYPES)
+
+
+class ServerTimingMiddleware:
+    # Collects the stage timings recorded while handling a request (core.metrics.timed)
+    # into a Server-Timing response header and the per-route request metrics.
+    # Streaming responses only carry the stages finished before their headers went out.
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        timings: dict[str, float] = {}
+        token = request_timings.set(timings)
+        started = time.perf_counter()
+        status = 500
+
+        async def timing_send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                header = server_timing_header(timings, time.perf_counter() - started)
+                message["headers"] = list(message.get("headers", [])) + [(b"server-timing", header.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, timing_send)
+        finally:
+            request_timings.reset(token)
+            route = getattr(scope.get("route"), "path", "unmatched")
+            http_requests.inc(1, route, str(status))
+            http_request_seconds.observe(time.perf_counter() - started, route)
+
+
+class ProfilingMiddleware:
+    # Runs cProfile over a sample of requests (sample_rate) and, if allowed, over any
+    # request sent with "X-Profile: 1". Profiles go to profile_dir as .prof files
+    # (open with snakeviz or pstats). cProfile sees the whole event loop thread, so
+    # other requests running at the same time show up in the profile too; only one
+    # request is profiled at a time.
+
+    def __init__(self, app, sample_rate: float, allow_header: bool, profile_dir: str):
+        self.app = app
+        self.sample_rate = sample_rate
+        self.allow_header = allow_header
+        self.profile_dir = profile_dir
+        self._active = False
+
+    def _wanted(self, scope) -> bool:
+        if self.allow_header and dict(scope["headers"]).get(b"x-profile") == b"1":
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self._active or not self._wanted(scope):
+            return await self.app(scope, receive, send)
+
+        self._active = True
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            profiler.disable()
+            self._active = False
+            os.makedirs(self.profile_dir, exist_ok=True)
+            name = scope["path"].strip("/").replace("/", "_") or "root"
+            path = os.path.join(self.profile_dir, f"{time.strftime('%Y%m%d-%H%M%S')}-{name}-{os.getpid()}.prof")
+            profiler.dump_stats(path)
+            logger.info(f"Wrote profile of {scope['method']} {scope['path']} to {path}")
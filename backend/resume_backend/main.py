@@ -1,19 +1,63 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from resume_backend.core.config import settings
+from resume_backend.core.middleware import (CompressionMiddleware, ProfilingMiddleware, RequestSizeLimitMiddleware,
+                                            ServerTimingMiddleware)
 from resume_backend.routers.optimize import router
+from resume_backend.routers.jobs import router as jobs_router
+from resume_backend.routers.metrics import router as metrics_router
+from resume_backend.services.document_parser import parser_pool
+from resume_backend.services.job_queue import job_workers
+from resume_backend.services.pdf_renderer import render_pool
+from resume_backend.services.warmup import warm_up
 import uvicorn
 
-app = FastAPI(title="Resume Optimizer API", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    job_workers.start()
+    warm_up.start()
+    yield
+    await warm_up.stop()
+    await job_workers.stop()
+    parser_pool.shutdown()
+    render_pool.shutdown()
+
+app = FastAPI(title="Resume Optimizer API", version="1.0.0", lifespan=lifespan)
+
+# Reject oversized bodies before they are buffered
+app.add_middleware(RequestSizeLimitMiddleware,
+                   max_bytes=(settings.MAX_FILE_SIZE_MB + settings.MAX_FORM_OVERHEAD_MB) * 1024 * 1024)
+
+# gzip/brotli for whole responses; inside ServerTimingMiddleware so "compress" is timed
+if settings.COMPRESSION_MIN_BYTES > 0:
+    app.add_middleware(CompressionMiddleware, minimum_size=settings.COMPRESSION_MIN_BYTES,
+                       gzip_level=settings.GZIP_LEVEL, brotli_quality=settings.BROTLI_QUALITY)
+
+# Per-stage timings as a Server-Timing header, and request metrics for /metrics
+app.add_middleware(ServerTimingMiddleware)
+
+if settings.PROFILE_SAMPLE_RATE > 0 or settings.PROFILE_ON_HEADER:
+    app.add_middleware(ProfilingMiddleware, sample_rate=settings.PROFILE_SAMPLE_RATE,
+                       allow_header=settings.PROFILE_ON_HEADER, profile_dir=settings.PROFILE_DIR)
 
 # Allow CORS for frontend dev server
 app.add_middleware(CORSMiddleware, allow_origins=["http://localhost:5173", "http://127.0.0.1:5173"],
-                   allow_methods=["*"], allow_headers=["*"])
+                   allow_methods=["*"], allow_headers=["*"], expose_headers=["Server-Timing"])
 
 app.include_router(router)
+app.include_router(jobs_router)
+app.include_router(metrics_router)
 
 @app.get("/")
 def read_root():
     return {"message": "Resume Optimizer API is ready"}
 
+@app.get("/ready")
+def read_ready():
+    # Readiness probe: 503 until the startup warm-up is done. "/" is the liveness probe.
+    return JSONResponse(warm_up.status(), status_code=200 if warm_up.ready else 503)
+
 if __name__ == "__main__":
     uvicorn.run("resume_backend.main:app", host="0.0.0.0", port=8000, reload=True)
@@ -0,0 +1,86 @@
+from fastapi import APIRouter, File, Form, UploadFile, HTTPException
+from fastapi.responses import StreamingResponse
+import asyncio
+import logging
+from pathlib import Path
+from resume_backend.core.config import settings
+from resume_backend.core.errors import UploadError
+from resume_backend.core.metrics import timed
+from resume_backend.core.sse import SSE_HEADERS, sse_event
+from resume_backend.routers.optimize import ALLOWED
+from resume_backend.services.job_queue import job_store, job_workers
+from resume_backend.services.upload import ingest_upload
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/jobs")
+
+def _job_response(job: dict) -> dict:
+    result = job.pop("result")
+    if job["status"] == "succeeded":
+        job["html"] = result
+    return job
+
+async def _get_job(job_id: str) -> dict:
+    job = await asyncio.to_thread(job_store.get, job_id)
+    if job is None:
+        raise HTTPException(404, "Job not found.")
+    return job
+
+@router.post("", status_code=202)
+async def create_job(
+    resume: UploadFile = File(...),
+    job_description: str = Form(...),
+    hide_contact_details: bool = Form(False),
+):
+    if resume.content_type not in ALLOWED:
+        raise HTTPException(400, "Only PDF and DOCX supported.")
+
+    if await asyncio.to_thread(job_store.count_pending) >= settings.JOBS_MAX_QUEUED:
+        raise HTTPException(503, "Too many queued jobs, please retry shortly.", headers={"Retry-After": "30"})
+
+    try:
+        with timed("upload"):
+            upload = await ingest_upload(resume, settings.MAX_FILE_SIZE_MB * 1024 * 1024)
+    except UploadError as e:
+        raise HTTPException(e.status_code, str(e))
+    try:
+        file_bytes = await asyncio.to_thread(Path(upload.path).read_bytes)
+    finally:
+        upload.cleanup()
+
+    job_id = await asyncio.to_thread(job_store.enqueue, file_bytes, upload.filename, upload.ext, job_description,
+                                     hide_contact_details)
+    job_workers.notify()
+    logger.info(f"Job {job_id}: queued ({upload.filename})")
+    return {"id": job_id, "status": "queued"}
+
+@router.get("/{job_id}")
+async def get_job(job_id: str):
+    return _job_response(await _get_job(job_id))
+
+@router.get("/{job_id}/events")
+async def job_events(job_id: str):
+    await _get_job(job_id)
+
+    async def events():
+        last = None
+        while True:
+            job = await asyncio.to_thread(job_store.get, job_id)
+            if job is None:
+                yield sse_event("error", {"detail": "Job not found."})
+                return
+            state = (job["status"], job["stage"])
+            if state != last:
+                last = state
+                if job["status"] == "succeeded":
+                    yield sse_event("done", _job_response(job))
+                    return
+                if job["status"] == "failed":
+                    yield sse_event("error", _job_response(job))
+                    return
+                yield sse_event("status", {"id": job_id, "status": job["status"], "stage": job["stage"],
+                                           "progress": job["progress"]})
+            await asyncio.sleep(0.5)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
@@ -0,0 +1,9 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from resume_backend.core.metrics import render_metrics
+
+router = APIRouter()
+
+@router.get("/metrics")  # Prometheus text exposition format
+async def metrics():
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
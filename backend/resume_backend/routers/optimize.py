@@ -1,10 +1,19 @@
-from fastapi import APIRouter, File, Form, UploadFile, HTTPException
+from fastapi import APIRouter, File, Form, UploadFile, HTTPException, Request
 from fastapi.responses import StreamingResponse, JSONResponse
+import asyncio
 import io
+import json
 import logging
-from resume_backend.services.document_parser import parse_file_to_markdown
-from resume_backend.services.llm_chain import generate_optimized_html
+from resume_backend.services.document_parser import aparse_upload, parse_cache
+from resume_backend.services.compaction import compact_job_description
+from resume_backend.services.llm_chain import (analyze_job_description, generate_optimized_html, jd_analysis_cache,
+                                               stream_optimized_html, result_cache)
+from resume_backend.services.pdf_renderer import html_to_pdf, pdf_cache
 from resume_backend.core.config import settings
+from resume_backend.core.errors import ServiceBusyError, UploadError
+from resume_backend.core.metrics import timed
+from resume_backend.core.sse import SSE_HEADERS, sse_event
+from resume_backend.services.upload import ingest_upload
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -13,46 +22,222 @@ logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api")
 ALLOWED = {"application/pdf",
            "application/vnd.openxmlformats-officedocument.wordprocessingml.document"}
+PDF_CHUNK_SIZE = 64 * 1024
+
+def _service_busy(e: ServiceBusyError) -> HTTPException:
+    return HTTPException(503, str(e), headers={"Retry-After": str(e.retry_after)})
+
+async def _sse_html_events(md: str, job_description: str, hide_contact_details: bool):
+    total = 0
+    try:
+        async for chunk in stream_optimized_html(md, job_description, hide_contact_details):
+            total += len(chunk)
+            yield sse_event("chunk", {"html": chunk})
+    except ServiceBusyError as e:
+        logger.warning(f"Streamed optimization rejected: {str(e)}")
+        yield sse_event("error", {"detail": str(e), "retry_after": e.retry_after})
+        return
+    except Exception as e:
+        # Headers are already sent, so failures are reported in-band
+        logger.error(f"Error during streamed optimization: {str(e)}")
+        yield sse_event("error", {"detail": f"Optimization failed: {str(e)}"})
+        return
+    logger.info(f"Streamed HTML ({total} chars)")
+    yield sse_event("done", {"chars": total})
+
+async def _ndjson_batch_results(md: str, items: list[tuple[int, str]], hide_contact_details: bool):
+    semaphore = asyncio.Semaphore(settings.BATCH_CONCURRENCY)
+
+    async def run(index: int, job_description: str) -> dict:
+        async with semaphore:
+            try:
+                html = await generate_optimized_html(md, job_description, hide_contact_details)
+                return {"index": index, "html": html}
+            except ServiceBusyError as e:
+                return {"index": index, "error": str(e), "retry_after": e.retry_after}
+            except Exception as e:
+                # One failed posting must not sink the rest of the batch
+                logger.error(f"Error during batch optimization (item {index}): {str(e)}")
+                return {"index": index, "error": f"Optimization failed: {str(e)}"}
+
+    tasks = [asyncio.create_task(run(i, jd)) for i, jd in items]
+    failed = 0
+    try:
+        for next_result in asyncio.as_completed(tasks):
+            result = await next_result
+            failed += "error" in result
+            yield json.dumps(result) + "\n"
+    finally:
+        # Client went away: stop generating for it
+        for task in tasks:
+            task.cancel()
+    yield json.dumps({"done": True, "succeeded": len(tasks) - failed, "failed": failed}) + "\n"
+
+async def _pdf_chunks(pdf: bytes):
+    view = memoryview(pdf)
+    for start in range(0, len(view), PDF_CHUNK_SIZE):
+        yield bytes(view[start:start + PDF_CHUNK_SIZE])
+
+async def _ingest_and_parse(resume: UploadFile) -> str:
+    try:
+        with timed("upload"):
+            upload = await ingest_upload(resume, settings.MAX_FILE_SIZE_MB * 1024 * 1024)
+    except UploadError as e:
+        raise HTTPException(e.status_code, str(e))
+
+    try:
+        return await aparse_upload(upload)
+    finally:
+        upload.cleanup()
+
+async def _read_and_parse(resume: UploadFile) -> str:
+    logger.info(f"Processing file: {resume.filename}")
+    try:
+        md = await _ingest_and_parse(resume)
+    except HTTPException:
+        raise
+    except ServiceBusyError as e:
+        raise _service_busy(e)
+    except Exception as e:
+        logger.error(f"Error during optimization: {str(e)}")
+        raise HTTPException(500, f"Optimization failed: {str(e)}")
+    logger.info(f"Extracted resume content ({len(md)} chars)")
+    if settings.DEBUG_LOG_CONTENT:
+        logger.info(f"Resume content:\n{md}")
+    return md
 
 @router.post("/optimize")
 async def optimize_resume(
+    request: Request,
     resume: UploadFile = File(...),
     job_description: str = Form(...),
     hide_contact_details: bool = Form(False),
 ):
     if resume.content_type not in ALLOWED:
         raise HTTPException(400, "Only PDF and DOCX supported.")
+
+    md = await _read_and_parse(resume)
+
+    # Clients that accept SSE get the HTML token-by-token instead of one JSON body
+    if "text/event-stream" in request.headers.get("accept", ""):
+        return StreamingResponse(_sse_html_events(md, job_description, hide_contact_details),
+                                 media_type="text/event-stream", headers=SSE_HEADERS)
     
     try:
-        raw = await resume.read()
-        if len(raw) > settings.MAX_FILE_SIZE_MB * 1024 * 1024:
-            raise HTTPException(413, "File too large.")
-
-        logger.info(f"Processing file: {resume.filename}")
-        md = parse_file_to_markdown(raw, resume.filename)
-        logger.info(f"Extracted resume content ({len(md)} chars):\n{md[:500]}...")
-        
         logger.info("Generating optimized HTML...")
         html = await generate_optimized_html(md, job_description, hide_contact_details)
-        logger.info(f"Generated HTML ({len(html)} chars):\n{html[:500]}...")
+        logger.info(f"Generated HTML ({len(html)} chars)")
         
         return JSONResponse({"html": html})
+    except ServiceBusyError as e:
+        logger.warning(f"Optimization rejected: {str(e)}")
+        raise _service_busy(e)
     except Exception as e:
         logger.error(f"Error during optimization: {str(e)}")
         raise HTTPException(500, f"Optimization failed: {str(e)}")
 
+@router.post("/optimize/stream")
+async def optimize_resume_stream(
+    resume: UploadFile = File(...),
+    job_description: str = Form(...),
+    hide_contact_details: bool = Form(False),
+):
+    if resume.content_type not in ALLOWED:
+        raise HTTPException(400, "Only PDF and DOCX supported.")
+
+    md = await _read_and_parse(resume)
+    logger.info("Streaming optimized HTML...")
+    return StreamingResponse(_sse_html_events(md, job_description, hide_contact_details),
+                             media_type="text/event-stream", headers=SSE_HEADERS)
+
+@router.post("/optimize/batch")
+async def optimize_resume_batch(
+    resume: UploadFile = File(...),
+    job_descriptions: list[str] = Form(...),
+    hide_contact_details: bool = Form(False),
+):
+    if resume.content_type not in ALLOWED:
+        raise HTTPException(400, "Only PDF and DOCX supported.")
+
+    # Blank entries are skipped but keep their slot so indices match the request
+    items = [(i, jd) for i, jd in enumerate(job_descriptions) if jd.strip()]
+    if not items:
+        raise HTTPException(400, "At least one job description is required.")
+    if len(items) > settings.BATCH_MAX_ITEMS:
+        raise HTTPException(400, f"At most {settings.BATCH_MAX_ITEMS} job descriptions per batch.")
+
+    # Parse once, then fan out one generation per posting; results stream back as NDJSON
+    # lines in completion order, each tagged with the index of its job description.
+    md = await _read_and_parse(resume)
+    logger.info(f"Batch optimizing against {len(items)} job descriptions...")
+    return StreamingResponse(_ndjson_batch_results(md, items, hide_contact_details),
+                             media_type="application/x-ndjson", headers={"X-Accel-Buffering": "no"})
+
+@router.post("/optimize/pdf")
+async def optimize_resume_pdf(
+    resume: UploadFile = File(...),
+    job_description: str = Form(...),
+    hide_contact_details: bool = Form(False),
+):
+    if resume.content_type not in ALLOWED:
+        raise HTTPException(400, "Only PDF and DOCX supported.")
+
+    md = await _read_and_parse(resume)
+    try:
+        html = await generate_optimized_html(md, job_description, hide_contact_details)
+        pdf = await html_to_pdf(html)
+    except ServiceBusyError as e:
+        logger.warning(f"PDF optimization rejected: {str(e)}")
+        raise _service_busy(e)
+    except Exception as e:
+        logger.error(f"Error generating PDF: {str(e)}")
+        raise HTTPException(500, f"PDF generation failed: {str(e)}")
+
+    return StreamingResponse(_pdf_chunks(pdf), media_type="application/pdf", headers={
+        "Content-Disposition": 'attachment; filename="optimized_resume.pdf"',
+        "Content-Length": str(len(pdf)),
+    })
+
+@router.post("/jd/analysis")
+async def prewarm_jd_analysis(job_description: str = Form(...)):
+    # Analyze a posting ahead of time, e.g. when it is published, so the first
+    # candidates tailored to it do not wait for the analysis
+    if not settings.JD_ANALYSIS_ENABLED:
+        raise HTTPException(400, "Job description analysis is disabled (JD_ANALYSIS_ENABLED).")
+    if not job_description.strip():
+        raise HTTPException(400, "Job description is empty.")
+    try:
+        jd = compact_job_description(job_description)
+        analysis, cached = await analyze_job_description(jd.text)
+    except ServiceBusyError as e:
+        raise _service_busy(e)
+    except Exception as e:
+        logger.error(f"Error analyzing job description: {str(e)}")
+        raise HTTPException(500, f"Job description analysis failed: {str(e)}")
+    logger.info(f"Job description analysis {'cache hit' if cached else 'generated'} ({len(analysis)} chars)")
+    return {"analysis": analysis, "cached": cached}
+
 @router.post("/optimize/html")  # Debug: return raw HTML
 async def get_html(resume: UploadFile = File(...), job_description: str = Form(...)):
     try:
-        raw = await resume.read()
-        md = parse_file_to_markdown(raw, resume.filename)
+        md = await _ingest_and_parse(resume)
         html = await generate_optimized_html(md, job_description)
         return {"html": html}
+    except HTTPException:
+        raise
+    except ServiceBusyError as e:
+        raise _service_busy(e)
     except Exception as e:
         logger.error(f"Error generating HTML: {str(e)}")
         raise HTTPException(500, f"HTML generation failed: {str(e)}")
 
 
+@router.get("/cache/stats")
+async def cache_stats():
+    return {"parse": parse_cache.stats(), "result": result_cache.stats(), "pdf": pdf_cache.stats(),
+            "jd_analysis": jd_analysis_cache.stats()}
+
+
 @router.post("/optimize/test") # Simple test endpoint
 async def test_endpoint():
     return {"status": "ok", "message": "Backend is running"}
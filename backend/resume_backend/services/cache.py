@@ -0,0 +1,199 @@
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+class TieredCache:
+    # In-memory LRU bounded by total value size, optionally backed by a SQLite file
+    # so entries survive restarts and are shared between uvicorn workers.
+    # Keys are strings, values are bytes; callers encode/decode their own payloads.
+
+    def __init__(self, name: str, max_bytes: int, ttl_seconds: float | None = None,
+                 db_path: str | None = None, max_disk_bytes: int | None = None):
+        self.name = name
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.max_disk_bytes = max_disk_bytes
+        self._entries: OrderedDict[str, tuple[bytes, float | None]] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._db = self._open_db(db_path) if db_path else None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _open_db(self, db_path: str) -> sqlite3.Connection:
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        db = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS cache_entries ("
+            " cache TEXT NOT NULL, key TEXT NOT NULL, value BLOB NOT NULL, size INTEGER NOT NULL,"
+            " expires_at REAL, accessed_at REAL NOT NULL, PRIMARY KEY (cache, key))"
+        )
+        db.execute("CREATE INDEX IF NOT EXISTS cache_entries_lru ON cache_entries (cache, accessed_at)")
+        return db
+
+    def _expiry(self) -> float | None:
+        return time.time() + self.ttl_seconds if self.ttl_seconds else None
+
+    def _remember(self, key: str, value: bytes, expires_at: float | None):
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._size -= len(old[0]) + len(key)
+        size = len(value) + len(key)
+        if size > self.max_bytes:
+            return
+        self._entries[key] = (value, expires_at)
+        self._size += size
+        while self._size > self.max_bytes:
+            old_key, (old_value, _) = self._entries.popitem(last=False)
+            self._size -= len(old_value) + len(old_key)
+            self.evictions += 1
+
+    def get(self, key: str) -> bytes | None:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at is None or expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+                self._size -= len(value) + len(key)
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value, expires_at FROM cache_entries WHERE cache = ? AND key = ?",
+                    (self.name, key),
+                ).fetchone()
+                if row is not None and (row[1] is None or row[1] > now):
+                    self._db.execute(
+                        "UPDATE cache_entries SET accessed_at = ? WHERE cache = ? AND key = ?",
+                        (now, self.name, key),
+                    )
+                    self._remember(key, row[0], row[1])
+                    self.disk_hits += 1
+                    return row[0]
+
+            self.misses += 1
+            return None
+
+    def set(self, key: str, value: bytes):
+        expires_at = self._expiry()
+        with self._lock:
+            self._remember(key, value, expires_at)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO cache_entries (cache, key, value, size, expires_at, accessed_at)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    (self.name, key, value, len(value), expires_at, time.time()),
+                )
+                self._trim_disk()
+
+    def _trim_disk(self):
+        self._db.execute(
+            "DELETE FROM cache_entries WHERE cache = ? AND expires_at IS NOT NULL AND expires_at <= ?",
+            (self.name, time.time()),
+        )
+        if not self.max_disk_bytes:
+            return
+        (total,) = self._db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM cache_entries WHERE cache = ?", (self.name,)
+        ).fetchone()
+        if total <= self.max_disk_bytes:
+            return
+        # Drop least recently used rows until we are back under budget
+        excess = total - self.max_disk_bytes
+        freed = 0
+        stale = []
+        for key, size in self._db.execute(
+            "SELECT key, size FROM cache_entries WHERE cache = ? ORDER BY accessed_at", (self.name,)
+        ):
+            stale.append((self.name, key))
+            freed += size
+            if freed >= excess:
+                break
+        self._db.executemany("DELETE FROM cache_entries WHERE cache = ? AND key = ?", stale)
+        self.evictions += len(stale)
+
+    async def aget(self, key: str) -> bytes | None:
+        if self._db is None:
+            return self.get(key)
+        return await asyncio.to_thread(self.get, key)
+
+    async def aset(self, key: str, value: bytes):
+        if self._db is None:
+            return self.set(key, value)
+        await asyncio.to_thread(self.set, key, value)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "disk": self._db is not None,
+            }
+
+
+class SingleFlight:
+    # Coalesces concurrent calls for the same key onto one in-flight task, so
+    # duplicate requests share a single upstream call and its result or error.
+    # With cancel_abandoned, the task is cancelled once every caller waiting on it
+    # has been cancelled (clients gone), instead of running on with nobody to use it.
+
+    def __init__(self, cancel_abandoned: bool = False):
+        self.cancel_abandoned = cancel_abandoned
+        self._inflight: dict[str, asyncio.Task] = {}
+        self._waiters: dict[asyncio.Task, int] = {}
+
+    def join(self, key: str, fn) -> tuple[asyncio.Task, bool]:
+        # Registers a caller for key, starting fn() if nothing is in flight. Returns the
+        # task and whether this call started it; every join needs a matching leave.
+        task = self._inflight.get(key)
+        started = task is None
+        if started:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        return task, started
+
+    def leave(self, key: str, task: asyncio.Task):
+        self._waiters[task] -= 1
+        if not self._waiters[task]:
+            del self._waiters[task]
+            # Only still running here if the last caller gave up on it
+            if self.cancel_abandoned and not task.done():
+                self._forget(key, task)
+                task.cancel()
+
+    async def do(self, key: str, fn):
+        task, _ = self.join(key, fn)
+        try:
+            # shield: one caller disconnecting must not cancel the call for the others
+            return await asyncio.shield(task)
+        finally:
+            self.leave(key, task)
+
+    def _forget(self, key: str, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._inflight
+
+    def __len__(self) -> int:
+        return len(self._inflight)
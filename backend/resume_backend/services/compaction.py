@@ -0,0 +1,178 @@
+import logging
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from resume_backend.core.config import settings
+from resume_backend.services.llm_client import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# Part of the result cache key: bump whenever compaction output changes
+COMPACTION_VERSION = "3"
+
+TRUNCATION_MARKER = "...(truncated)"
+
+_INVISIBLE = re.compile(r"[\u00ad\u200b\u200c\u200d\u2060\ufeff]")
+_SPACES = re.compile(r"[ \t\u00a0\u2000-\u200a\u202f\u205f\u3000]+")
+_BLANK_LINES = re.compile(r"\n{3,}")
+# "experi-\nence" -> "experience"; only lowercase on both sides, so "Full-\nStack" stays
+_HYPHENATED = re.compile(r"([a-z])-\n([a-z])")
+_DIGITS = re.compile(r"\d+")
+# "Page 2", "Page 2 of 3", "2 of 3", "- 2 -"; matched against the line with digits replaced by #
+_PAGE_LABEL = re.compile(r"^page\s*#(\s*(of|/)\s*#)?$|^#\s*of\s*#$|^-\s*#\s*-$")
+# "2" or "2/3": only a page number when such lines count the pages (years and dates have 4 digits)
+_BARE_PAGE_NUMBER = re.compile(r"^(\d{1,3})(?:\s*/\s*(\d{1,3}))?$")
+_CONTACT = re.compile(r"@|https?://|www\.|linkedin\.com|github\.com|\(?#\)?[\s.-]#[\s.-]#")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+# Sentences that are the same in every posting and tell the model nothing about the role.
+# Benefits are matched on phrasing that offers them to the candidate ("we offer a
+# competitive...", "you'll receive medical, dental...") or listed on their own, not
+# on the topic: for an HR or benefits role, a sentence about dental plans or 401(k)
+# matching is the job itself.
+JD_BOILERPLATE = re.compile(
+    r"equal (employment )?opportunity( and affirmative action)? employer|affirmative action employer"
+    r"|without regard to (race|color|religion|sex|age|gender|national origin|disability)"
+    r"|regardless of (race|color|religion|sex|age|gender|national origin|disability)"
+    r"|qualified applicants will receive consideration|sexual orientation,? (and )?gender identity|or veteran status"
+    r"|we celebrate diversity|committed to (creating |building |fostering )?an? (diverse and )?inclusive"
+    r"|reasonable accommodations? (for|to) (candidates|applicants|individuals|people) with disabilities"
+    r"|participates? in e-verify|(employment|offers?( of employment)?) (is|are) contingent (up)?on"
+    r"|^[\s#*]*(what|here's what|why) (we offer|you('ll| will) get)[\s:*]*$"
+    r"|\bwe offer (you )?(an? )?(highly )?(competitive|generous|comprehensive|great|excellent|attractive|flexible)\b"
+    r"|competitive (salary|pay|compensation),? (and |plus )?(great |generous )?benefits"
+    r"|\b(we (offer|provide)|you('ll| will) (receive|enjoy|get|have access to))\b.{0,40}?(medical|health),? dental"
+    # Perks listed on their own, as a sentence or bullet of the benefits section
+    r"|^[\s•*-]*(our |the )?((comprehensive|competitive|generous) )?(perks|benefits)( and (perks|benefits))?"
+    r"( package)? includes?\b"
+    r"|^[\s•*-]*(a )?401\(?k\)? (plan )?with (a )?(\d+% )?(company |employer )?match|^[\s•*-]*unlimited pto"
+    r"|^[\s•*-]*\d+ weeks of paid (parental |family )?leave"
+    r"|^[\s•*-]*(an? )?(\$[\d,]+ )?(yearly |annual |monthly )?(wellness|learning|home office|commuter) (stipend|budget)",
+    re.IGNORECASE,
+)
+
+
+@dataclass
+class CompactedText:
+    text: str
+    tokens_before: int
+    tokens_after: int
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.tokens_before - self.tokens_after
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    # tiktoken is optional, and its encodings are downloaded on first use; without it
+    # (or offline) token counts fall back to the ~4 chars/token estimate
+    if not settings.TOKENIZER_ENCODING:
+        return None
+    try:
+        import tiktoken
+        return tiktoken.get_encoding(settings.TOKENIZER_ENCODING)
+    except Exception as e:
+        logger.warning(f"Tokenizer {settings.TOKENIZER_ENCODING} unavailable ({type(e).__name__}), "
+                       f"estimating tokens from length")
+        return None
+
+
+def count_tokens(text: str) -> int:
+    encoding = _encoding()
+    if encoding is None:
+        return estimate_tokens(text)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    encoding = _encoding()
+    if encoding is None:
+        max_chars = max_tokens * 4
+        return text if len(text) <= max_chars else text[:max_chars] + TRUNCATION_MARKER
+    tokens = encoding.encode(text, disallowed_special=())
+    return text if len(tokens) <= max_tokens else encoding.decode(tokens[:max_tokens]) + TRUNCATION_MARKER
+
+
+def normalize_whitespace(text: str) -> str:
+    text = _INVISIBLE.sub("", text.replace("\r\n", "\n").replace("\r", "\n"))
+    lines = [_SPACES.sub(" ", line).strip() for line in text.split("\n")]
+    return _BLANK_LINES.sub("\n\n", "\n".join(lines)).strip()
+
+
+def dehyphenate(text: str) -> str:
+    return _HYPHENATED.sub(r"\1\2", text)
+
+
+def _bare_page_numbers(lines: list[str]) -> set[int]:
+    # Indexes of lines that are bare page numbers: at least two lines of one form,
+    # counting up one page at a time from 1 or 2 ("1", "2", "3" or "1/3", "2/3", "3/3")
+    groups: dict[str | None, list[tuple[int, int]]] = {}
+    for i, line in enumerate(lines):
+        match = _BARE_PAGE_NUMBER.match(line)
+        if match:
+            groups.setdefault(match.group(2), []).append((i, int(match.group(1))))
+
+    found = set()
+    for total, group in groups.items():
+        numbers = [number for _, number in group]
+        if (len(numbers) > 1 and numbers[0] <= 2 and numbers == list(range(numbers[0], numbers[0] + len(numbers)))
+                and (total is None or numbers[-1] <= int(total))):
+            found.update(i for i, _ in group)
+    return found
+
+
+def drop_page_furniture(text: str) -> str:
+    # Page numbers go everywhere. Header/footer lines that repeat on every page
+    # (name and contact details, usually) are kept once. A repeated line without
+    # contact details, e.g. the same job title at two companies, is left alone.
+    lines = text.split("\n")
+    keys = [_DIGITS.sub("#", line.lower()) for line in lines]
+    counts: dict[str, int] = {}
+    for key in keys:
+        if key:
+            counts[key] = counts.get(key, 0) + 1
+    page_numbers = _bare_page_numbers(lines)
+
+    kept, seen = [], set()
+    for i, (line, key) in enumerate(zip(lines, keys)):
+        if _PAGE_LABEL.match(key) or i in page_numbers:
+            continue
+        if counts.get(key, 0) > 1 and _CONTACT.search(key):
+            if key in seen:
+                continue
+            seen.add(key)
+        kept.append(line)
+    return "\n".join(kept)
+
+
+def drop_boilerplate(text: str) -> str:
+    # Drops EEO/benefits sentences and sentences repeated verbatim (postings pasted twice)
+    lines, seen = [], set()
+    for line in text.split("\n"):
+        sentences = []
+        for sentence in _SENTENCE_END.split(line):
+            key = sentence.strip().lower()
+            if not key or JD_BOILERPLATE.search(sentence) or (len(key) > 20 and key in seen):
+                continue
+            seen.add(key)
+            sentences.append(sentence)
+        if sentences or not line.strip():
+            lines.append(" ".join(sentences))
+    return _BLANK_LINES.sub("\n\n", "\n".join(lines)).strip()
+
+
+def _compact(original: str, text: str, max_tokens: int) -> CompactedText:
+    if max_tokens:
+        text = truncate_to_tokens(text, max_tokens)
+    return CompactedText(text, count_tokens(original), count_tokens(text))
+
+
+def compact_resume(text: str) -> CompactedText:
+    compacted = normalize_whitespace(drop_page_furniture(dehyphenate(normalize_whitespace(text))))
+    return _compact(text, compacted, settings.RESUME_MAX_TOKENS)
+
+
+def compact_job_description(text: str) -> CompactedText:
+    compacted = drop_boilerplate(normalize_whitespace(text))
+    return _compact(text, compacted, settings.JD_MAX_TOKENS)
@@ -1,33 +1,180 @@
+import asyncio
+import hashlib
 import io
+import itertools
 import logging
-from PyPDF2 import PdfReader
-from docx import Document
+import mmap
+from contextlib import contextmanager
+from typing import Iterable
+from resume_backend.core.config import settings
+from resume_backend.core.metrics import timed
+from resume_backend.services.cache import TieredCache
+from resume_backend.services.upload import IngestedUpload
+from resume_backend.services.worker_pool import ProcessWorkerPool
 
 logger = logging.getLogger(__name__)
 
-def parse_file_to_markdown(file_bytes: bytes, filename: str) -> str:
-    ext = "." + filename.rsplit(".", 1)[-1].lower()
-    logger.info(f"Parsing file: {filename} ({len(file_bytes)} bytes), extension: {ext}")
+# Bump whenever extraction output changes so stale cache entries are ignored
+PARSER_VERSION = "2"
+
+parser_pool = ProcessWorkerPool(
+    "parser",
+    size=settings.PARSER_POOL_SIZE,
+    timeout=settings.PARSER_TIMEOUT_SECONDS,
+    queue_limit=settings.PARSER_QUEUE_LIMIT,
+)
+
+parse_cache = TieredCache(
+    "parse",
+    max_bytes=settings.PARSE_CACHE_MAX_MB * 1024 * 1024,
+    ttl_seconds=settings.PARSE_CACHE_TTL_SECONDS,
+    db_path=settings.PARSE_CACHE_DB_PATH or None,
+    max_disk_bytes=settings.PARSE_CACHE_MAX_DISK_MB * 1024 * 1024,
+)
+
+def _file_ext(filename: str) -> str:
+    return "." + filename.rsplit(".", 1)[-1].lower()
+
+def _cache_key(sha256: str, ext: str) -> str:
+    # The limits are part of the key: changing them changes what gets extracted
+    return f"{sha256}:{ext.lstrip('.')}:v{PARSER_VERSION}:{char_budget()}:{settings.PARSE_MAX_PAGES}"
+
+def char_budget() -> int:
+    # Nothing past this is ever sent to the model. RESUME_MAX_TOKENS is converted at
+    # ~4 characters per token, the same estimate llm_client uses for quotas.
+    budget = settings.RESUME_MAX_CHARS
+    if settings.RESUME_MAX_TOKENS:
+        budget = min(budget, settings.RESUME_MAX_TOKENS * 4)
+    return budget
+
+def _take_budget(texts: Iterable[str], budget: int) -> list[str]:
+    # Takes non-empty texts until their lines add up to the budget. texts can be lazy,
+    # so with a generator no page past the budget is ever extracted. Pages are kept
+    # whole; llm_chain truncates to the exact limit.
+    parts, size = [], 0
+    for text in texts:
+        if text:
+            parts.append(text)
+            size += len(text) + 1
+            if size >= budget:
+                break
+    return parts
+
+@contextmanager
+def _open_source(source: str | bytes):
+    # Uploads are memory-mapped from their temp file; raw bytes (job store) are wrapped
+    if isinstance(source, bytes):
+        yield io.BytesIO(source)
+        return
+    with open(source, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        yield buffer
+
+def warm_up_worker():
+    # Run once in every parser worker at startup. PyPDF2 and python-docx are only
+    # imported inside the workers, never by the API process itself.
+    import docx
+    import PyPDF2
+
+def count_pdf_pages(source: str | bytes) -> int:
+    from PyPDF2 import PdfReader
+
+    with _open_source(source) as stream:
+        return len(PdfReader(stream).pages)
+
+def extract_pdf_pages(source: str | bytes, start: int, stop: int, budget: int) -> list[str]:
+    # Runs in a parser worker: text of pages [start, stop), up to the budget
+    from PyPDF2 import PdfReader
+
+    with _open_source(source) as stream:
+        reader = PdfReader(stream)
+        return _take_budget((reader.pages[i].extract_text() for i in range(start, stop)), budget)
+
+def parse_cache_key(file_bytes: bytes, filename: str, ext: str | None = None) -> str:
+    return _cache_key(hashlib.sha256(file_bytes).hexdigest(), ext or _file_ext(filename))
+
+async def _cached_parse(key: str, filename: str, ext: str, source: str | bytes, fn, *args) -> str:
+    with timed("parse"):
+        cached = await parse_cache.aget(key)
+        if cached is not None:
+            logger.info(f"Parse cache hit for {filename}")
+            return cached.decode("utf-8")
+
+        md = None
+        if ext == ".pdf" and settings.PARSE_PARALLEL_MIN_PAGES > 0:
+            md = await _parse_pdf_parallel(source, filename)
+        if md is None:
+            md = await parser_pool.run(fn, *args)
+        await parse_cache.aset(key, md.encode("utf-8"))
+        return md
+
+async def _parse_pdf_parallel(source: str | bytes, filename: str) -> str | None:
+    # Long PDFs are split into one page range per parser worker, extracted concurrently.
+    # Every range stops at the budget on its own, but ranges past the page
+    # where the budget runs out still do their work: that is the price of not
+    # waiting for the earlier ones. Returns None for PDFs below the threshold.
+    page_count = await parser_pool.run(count_pdf_pages, source)
+    pages = min(page_count, settings.PARSE_MAX_PAGES)
+    if pages < settings.PARSE_PARALLEL_MIN_PAGES:
+        return None
+
+    budget = char_budget()
+    step = -(-pages // parser_pool.size)
+    ranges = await asyncio.gather(*(parser_pool.run(extract_pdf_pages, source, start, min(start + step, pages), budget)
+                                    for start in range(0, pages, step)))
+    text = "".join(page + "\n" for page in _take_budget(itertools.chain(*ranges), budget))
+    if not text.strip():
+        raise RuntimeError("Failed to extract text: PDF contains no text. Please use a text-based PDF, not a scanned image.")
+    logger.info(f"Extracted {len(text)} characters from {pages} of {page_count} PDF pages of {filename} "
+                f"in {len(ranges)} parallel tasks")
+    return text.strip()
+
+async def aparse_file_to_markdown(file_bytes: bytes, filename: str, ext: str | None = None) -> str:
+    # Same as parse_file_to_markdown, but cached by content hash and run in the parser process pool
+    ext = ext or _file_ext(filename)
+    return await _cached_parse(parse_cache_key(file_bytes, filename, ext), filename, ext, file_bytes,
+                               parse_file_to_markdown, file_bytes, filename, ext)
+
+async def aparse_upload(upload: IngestedUpload) -> str:
+    # Only the temp file path crosses the process boundary; the worker maps the file itself
+    return await _cached_parse(_cache_key(upload.sha256, upload.ext), upload.filename, upload.ext, upload.path,
+                               parse_path_to_markdown, upload.path, upload.ext)
+
+def parse_path_to_markdown(path: str, ext: str) -> str:
+    with _open_source(path) as buffer:
+        return _extract_markdown(buffer, ext, path, len(buffer))
+
+def parse_file_to_markdown(file_bytes: bytes, filename: str, ext: str | None = None) -> str:
+    # ext: the type detected from the content (IngestedUpload.ext); by default the filename's extension
+    return _extract_markdown(io.BytesIO(file_bytes), ext or _file_ext(filename), filename, len(file_bytes))
+
+def _extract_markdown(stream, ext: str, filename: str, size: int) -> str:
+    logger.info(f"Parsing file: {filename} ({size} bytes), extension: {ext}")
     
     try:
         if ext == ".pdf":
-            reader = PdfReader(io.BytesIO(file_bytes))
-            text = ""
-            for page in reader.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n"
-            
+            from PyPDF2 import PdfReader
+
+            reader = PdfReader(stream)
+            page_count = len(reader.pages)
+            pages = min(page_count, settings.PARSE_MAX_PAGES)
+            if pages < page_count:
+                logger.warning(f"Only extracting the first {pages} of {page_count} PDF pages")
+            # Page by page, stopping once the budget is reached
+            page_texts = _take_budget((reader.pages[i].extract_text() for i in range(pages)), char_budget())
+            text = "".join(page_text + "\n" for page_text in page_texts)
+
             if text.strip():
-                logger.info(f"Extracted {len(text)} characters from PDF")
+                logger.info(f"Extracted {len(text)} characters from {len(page_texts)} of {page_count} PDF pages")
                 return text.strip()
             else:
                 logger.error("PDF has no extractable text (might be scanned image)")
                 raise RuntimeError("PDF contains no text. Please use a text-based PDF, not a scanned image.")
                 
         elif ext == ".docx":
-            doc = Document(io.BytesIO(file_bytes))
-            text = "\n".join([para.text for para in doc.paragraphs if para.text.strip()])
+            from docx import Document
+
+            doc = Document(stream)
+            text = "\n".join(_take_budget((para.text for para in doc.paragraphs if para.text.strip()), char_budget()))
             
             if text.strip():
                 logger.info(f"Extracted {len(text)} characters from DOCX")
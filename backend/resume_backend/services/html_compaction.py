@@ -0,0 +1,119 @@
+import hashlib
+import html as html_lib
+import logging
+import re
+from collections import Counter
+from resume_backend.core.metrics import html_bytes_saved, html_placeholders
+
+logger = logging.getLogger(__name__)
+
+# Part of the result cache key: bump whenever the post-processed output changes
+HTML_COMPACTION_VERSION = "2"
+
+PLACEHOLDER = re.compile(r"\{\{\s*[A-Z][A-Z0-9_]*\s*\}\}")
+
+# A start tag, allowing ">" inside quoted attribute values
+_START_TAG = re.compile(r"""<[a-zA-Z][^\s/>]*(?:[^>"']|"[^"]*"|'[^']*')*>""")
+_STYLE_ATTR = re.compile(r"""\sstyle\s*=\s*(?:"([^"]*)"|'([^']*)')""", re.IGNORECASE)
+_CLASS_ATTR = re.compile(r"\sclass\s*=", re.IGNORECASE)
+_HEAD_END = re.compile(r"</head\s*>", re.IGNORECASE)
+_STYLE_TAG = re.compile(r"<style\b", re.IGNORECASE)
+# Comments, but not IE conditional comments
+_COMMENT = re.compile(r"<!--(?!\[if).*?-->", re.DOTALL)
+# HTML whitespace only: \s would also eat non-breaking spaces, which render
+_WHITESPACE = re.compile(r"[ \t\r\n\f]+")
+# What str.split() splits on besides HTML whitespace; without any of it split() is the faster route
+_OTHER_WHITESPACE = re.compile(r"[\v\x1c-\x1f\x85\xa0\u1680\u2000-\u200a\u2028\u2029\u202f\u205f\u3000]")
+# Where whitespace is content; matched against the lowercased document
+PRESERVED_WHITESPACE_TAGS = ("<pre", "<textarea", "<script")
+_PRESERVED_WHITESPACE_STYLE = re.compile(r"white-space\s*:\s*pre")
+
+
+def find_placeholders(html: str) -> list[str]:
+    return sorted(set(PLACEHOLDER.findall(html)))
+
+
+def strip_placeholders(html: str) -> str:
+    # Template placeholders the model left unfilled ({{GITHUB_OR_PORTFOLIO}} for a
+    # candidate without one) are blanked: the rest of the resume is still usable,
+    # and the tokens are already spent
+    placeholders = find_placeholders(html)
+    if not placeholders:
+        return html
+    html_placeholders.inc(len(placeholders))
+    logger.warning(f"Blanked leftover template placeholders in generated HTML: {', '.join(placeholders[:5])}")
+    return PLACEHOLDER.sub("", html)
+
+
+def _class_name(declarations: str) -> str:
+    # Named after the declarations, so two documents on one page (the frontend
+    # injects them into the app's DOM) never give one class different styles
+    return "r" + hashlib.sha256(declarations.encode("utf-8")).hexdigest()[:6]
+
+
+def _inline_style(tag: str) -> str | None:
+    # The style attribute of a start tag without a class attribute
+    match = _STYLE_ATTR.search(tag)
+    if not match or _CLASS_ATTR.search(tag):
+        return None
+    return (match.group(1) if match.group(1) is not None else match.group(2)).strip()
+
+
+def hoist_styles(html: str) -> str:
+    # Replaces every inline style used more than once with a class defined in one
+    # <style> block. Only the inline styles would have applied, and class rules
+    # from an unlayered stylesheet beat the app's base styles just as inline
+    # styles do, so the document renders the same. Documents that already have
+    # a stylesheet, or tags that already have a class, are left alone.
+    if _STYLE_TAG.search(html):
+        return html
+
+    # Start tags repeat verbatim (every <li> of a list), so work on distinct ones
+    tags = Counter(_START_TAG.findall(html))
+    styles = {tag: _inline_style(tag) for tag in tags}
+    counts: Counter[str] = Counter()
+    for tag, style in styles.items():
+        if style is not None:
+            counts[style] += tags[tag]
+
+    classes = {}
+    for style, count in counts.items():
+        declarations = html_lib.unescape(style).rstrip(";").strip()
+        # Entities are not decoded inside <style>, and some text cannot go there at all
+        if count > 1 and declarations and not any(c in declarations for c in "<{}"):
+            classes[style] = (_class_name(declarations), declarations)
+    if not classes:
+        return html
+
+    replacements = {}
+    for tag, style in styles.items():
+        if style in classes:
+            match = _STYLE_ATTR.search(tag)
+            replacements[tag] = tag[:match.start()] + f' class="{classes[style][0]}"' + tag[match.end():]
+    html = _START_TAG.sub(lambda tag: replacements.get(tag.group(), tag.group()), html)
+    stylesheet = "<style>" + "".join(f".{name}{{{declarations}}}" for name, declarations in classes.values()) + "</style>"
+    head_end = _HEAD_END.search(html)
+    if head_end:
+        return html[:head_end.start()] + stylesheet + html[head_end.start():]
+    return stylesheet + html
+
+
+def minify_whitespace(html: str) -> str:
+    # Runs of whitespace render as one space outside <pre>-like content, and
+    # comments not at all
+    lowered = html.lower()
+    if any(tag in lowered for tag in PRESERVED_WHITESPACE_TAGS) or _PRESERVED_WHITESPACE_STYLE.search(lowered):
+        return html.strip()
+    html = _COMMENT.sub("", html)
+    if _OTHER_WHITESPACE.search(html):
+        return _WHITESPACE.sub(" ", html).strip()
+    return " ".join(html.split())
+
+
+def compact_html(html: str) -> str:
+    # Shrinks generated markup without changing how it renders
+    compacted = minify_whitespace(hoist_styles(html))
+    saved = len(html.encode("utf-8")) - len(compacted.encode("utf-8"))
+    html_bytes_saved.inc(saved)
+    logger.info(f"HTML compaction saved {saved} bytes ({len(html)} -> {len(compacted)} chars)")
+    return compacted
@@ -0,0 +1,40 @@
+from functools import lru_cache
+from pathlib import Path
+from resume_backend.services.resume_schema import ResumeData
+
+TEMPLATES_DIR = Path(__file__).resolve().parent.parent / "templates"
+
+SKILL_LABELS = [
+    ("languages", "Languages"),
+    ("frameworks", "Frameworks & Libraries"),
+    ("cloud_devops", "Cloud & DevOps"),
+    ("databases", "Databases"),
+    ("tools", "Tools & Platforms"),
+    ("methodologies", "Methodologies"),
+]
+
+@lru_cache(maxsize=1)
+def get_template():
+    # Jinja is only needed in JSON mode and by the fake provider, so it is loaded on first render
+    from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+    env = Environment(
+        loader=FileSystemLoader(TEMPLATES_DIR),
+        autoescape=select_autoescape(["html", "j2"]),
+        trim_blocks=True,
+        lstrip_blocks=True,
+    )
+    return env.get_template("resume.html.j2")
+
+def template_source() -> str:
+    return (TEMPLATES_DIR / "resume.html.j2").read_text(encoding="utf-8")
+
+def render_resume_html(resume: ResumeData, hide_contact_details: bool = False) -> str:
+    contact = resume.contact
+    contact_parts = [] if hide_contact_details else [
+        part for part in (contact.location, contact.phone, contact.email, contact.linkedin, contact.website)
+        if part.strip()
+    ]
+    skill_rows = [(label, getattr(resume.skills, field)) for field, label in SKILL_LABELS
+                  if getattr(resume.skills, field).strip()]
+    return get_template().render(resume=resume, contact_parts=contact_parts, skill_rows=skill_rows).strip()
@@ -0,0 +1,257 @@
+import asyncio
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from resume_backend.core.config import settings
+from resume_backend.core.errors import ServiceBusyError
+from resume_backend.core.metrics import timed
+from resume_backend.services.document_parser import aparse_file_to_markdown
+from resume_backend.services.llm_chain import generate_optimized_html
+
+logger = logging.getLogger(__name__)
+
+# Progress reported for each stage a job moves through
+STAGES = {
+    "queued": 0.0,
+    "parsing": 0.1,
+    "generating": 0.3,
+    "postprocessing": 0.9,
+    "done": 1.0,
+}
+
+
+class JobStore:
+    # SQLite-backed queue. Workers claim jobs with a lease that they keep
+    # renewing; a job whose lease runs out (worker crashed or restarted) is
+    # picked up again by any worker sharing the same database file.
+
+    def __init__(self, db_path: str, lease_seconds: float, max_attempts: int):
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._db = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._db.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " id TEXT PRIMARY KEY, status TEXT NOT NULL, stage TEXT NOT NULL, progress REAL NOT NULL,"
+                " filename TEXT NOT NULL, file BLOB, job_description TEXT NOT NULL,"
+                " hide_contact_details INTEGER NOT NULL, result TEXT, error TEXT,"
+                " attempts INTEGER NOT NULL DEFAULT 0, worker_id TEXT, lease_until REAL,"
+                " created_at REAL NOT NULL, updated_at REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)")
+            # File type detected from the upload's content; databases from before it get the column added
+            if "ext" not in {column["name"] for column in self._db.execute("PRAGMA table_info(jobs)")}:
+                self._db.execute("ALTER TABLE jobs ADD COLUMN ext TEXT")
+
+    def enqueue(self, file_bytes: bytes, filename: str, ext: str, job_description: str,
+                hide_contact_details: bool) -> str:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO jobs (id, status, stage, progress, filename, ext, file, job_description,"
+                " hide_contact_details, created_at, updated_at) VALUES (?, 'queued', 'queued', 0, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, filename, ext, file_bytes, job_description, int(hide_contact_details), now, now),
+            )
+        return job_id
+
+    def count_pending(self) -> int:
+        with self._lock:
+            (count,) = self._db.execute("SELECT COUNT(*) FROM jobs WHERE status IN ('queued', 'running')").fetchone()
+        return count
+
+    def claim(self, worker_id: str) -> sqlite3.Row | None:
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._db.execute(
+                    "SELECT * FROM jobs WHERE status = 'queued' OR (status = 'running' AND lease_until < ?)"
+                    " ORDER BY created_at LIMIT 1",
+                    (now,),
+                ).fetchone()
+                if row is None:
+                    self._db.execute("COMMIT")
+                    return None
+                if row["attempts"] >= self.max_attempts:
+                    self._db.execute(
+                        "UPDATE jobs SET status = 'failed', error = ?, file = NULL, updated_at = ? WHERE id = ?",
+                        ("Job abandoned after repeated worker failures", now, row["id"]),
+                    )
+                    self._db.execute("COMMIT")
+                    return None
+                self._db.execute(
+                    "UPDATE jobs SET status = 'running', worker_id = ?, lease_until = ?, attempts = attempts + 1,"
+                    " updated_at = ? WHERE id = ?",
+                    (worker_id, now + self.lease_seconds, now, row["id"]),
+                )
+                self._db.execute("COMMIT")
+                return row
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+
+    def renew(self, job_id: str, worker_id: str):
+        with self._lock:
+            self._db.execute(
+                "UPDATE jobs SET lease_until = ? WHERE id = ? AND worker_id = ? AND status = 'running'",
+                (time.time() + self.lease_seconds, job_id, worker_id),
+            )
+
+    # set_stage, requeue and finish only touch a job the worker still holds: once its
+    # lease has run out, another worker may have claimed the job. They return whether it did.
+
+    def set_stage(self, job_id: str, worker_id: str, stage: str) -> bool:
+        with self._lock:
+            return self._db.execute(
+                "UPDATE jobs SET stage = ?, progress = ?, updated_at = ? WHERE id = ? AND worker_id = ?",
+                (stage, STAGES[stage], time.time(), job_id, worker_id),
+            ).rowcount > 0
+
+    def requeue(self, job_id: str, worker_id: str) -> bool:
+        # Put a job back without counting the attempt, e.g. when the LLM is saturated
+        with self._lock:
+            return self._db.execute(
+                "UPDATE jobs SET status = 'queued', stage = 'queued', progress = 0, attempts = attempts - 1,"
+                " worker_id = NULL, lease_until = NULL, updated_at = ? WHERE id = ? AND worker_id = ?",
+                (time.time(), job_id, worker_id),
+            ).rowcount > 0
+
+    def finish(self, job_id: str, worker_id: str, result: str | None = None, error: str | None = None) -> bool:
+        status = "failed" if error is not None else "succeeded"
+        stage = "done" if error is None else None
+        with self._lock:
+            return self._db.execute(
+                "UPDATE jobs SET status = ?, stage = COALESCE(?, stage), progress = CASE WHEN ? THEN 1.0 ELSE progress END,"
+                " result = ?, error = ?, file = NULL, lease_until = NULL, updated_at = ? WHERE id = ? AND worker_id = ?",
+                (status, stage, error is None, result, error, time.time(), job_id, worker_id),
+            ).rowcount > 0
+
+    def get(self, job_id: str) -> dict | None:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT id, status, stage, progress, error, result, created_at, updated_at FROM jobs WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+        return dict(row) if row is not None else None
+
+    def purge(self, older_than: float):
+        with self._lock:
+            self._db.execute(
+                "DELETE FROM jobs WHERE status IN ('succeeded', 'failed') AND updated_at < ?", (older_than,)
+            )
+
+
+class JobWorkers:
+    # Background tasks in this uvicorn process that pull jobs from the shared store
+
+    def __init__(self, store: JobStore, concurrency: int, poll_interval: float, retention_seconds: float):
+        self.store = store
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.retention_seconds = retention_seconds
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._tasks: list[asyncio.Task] = []
+        self._wakeup: asyncio.Event | None = None
+        self._last_purge = 0.0
+
+    def start(self):
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._run(i)) for i in range(self.concurrency)]
+        logger.info(f"Started {self.concurrency} job workers ({self.worker_id})")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def notify(self):
+        # Skip the poll delay for jobs submitted to this process
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _run(self, index: int):
+        # Each worker task has its own id, so a job it lost to another task of this
+        # process (lease expired) is not still updated by it
+        worker_id = f"{self.worker_id}:{index}"
+        while True:
+            try:
+                row = await asyncio.to_thread(self.store.claim, worker_id)
+            except Exception as e:
+                logger.error(f"Job worker {index} failed to claim a job: {str(e)}")
+                row = None
+            if row is None:
+                await self._idle()
+                continue
+            try:
+                await self._process(row, worker_id)
+            except Exception as e:
+                # A store error must not end this worker; the job's lease runs out and it is retried
+                logger.error(f"Job worker {index} failed on job {row['id']}: {str(e)}")
+
+    async def _idle(self):
+        if time.time() - self._last_purge > 3600:
+            self._last_purge = time.time()
+            try:
+                await asyncio.to_thread(self.store.purge, time.time() - self.retention_seconds)
+            except Exception as e:
+                logger.error(f"Failed to purge old jobs: {str(e)}")
+        self._wakeup.clear()
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _keep_lease(self, job_id: str, worker_id: str):
+        while True:
+            await asyncio.sleep(self.store.lease_seconds / 3)
+            await asyncio.to_thread(self.store.renew, job_id, worker_id)
+
+    async def _process(self, row: sqlite3.Row, worker_id: str):
+        job_id = row["id"]
+        logger.info(f"Job {job_id}: started (attempt {row['attempts'] + 1})")
+        lease = asyncio.create_task(self._keep_lease(job_id, worker_id))
+        try:
+            await asyncio.to_thread(self.store.set_stage, job_id, worker_id, "parsing")
+            md = await aparse_file_to_markdown(row["file"], row["filename"], row["ext"])
+
+            await asyncio.to_thread(self.store.set_stage, job_id, worker_id, "generating")
+            html = await generate_optimized_html(md, row["job_description"], bool(row["hide_contact_details"]))
+
+            await asyncio.to_thread(self.store.set_stage, job_id, worker_id, "postprocessing")
+            with timed("postprocess"):
+                html = html.strip()
+        except asyncio.CancelledError:
+            # Shutting down: leave the job running so its lease expires and another worker retries it
+            raise
+        except ServiceBusyError as e:
+            logger.warning(f"Job {job_id}: {str(e)} Requeueing in {e.retry_after}s")
+            lease.cancel()
+            await asyncio.sleep(e.retry_after)
+            if not await asyncio.to_thread(self.store.requeue, job_id, worker_id):
+                logger.warning(f"Job {job_id}: lease lost while waiting, another worker has it")
+        except Exception as e:
+            logger.error(f"Job {job_id}: failed: {str(e)}")
+            if not await asyncio.to_thread(self.store.finish, job_id, worker_id, error=f"Optimization failed: {str(e)}"):
+                logger.warning(f"Job {job_id}: lease lost, failure not recorded")
+        else:
+            if await asyncio.to_thread(self.store.finish, job_id, worker_id, result=html):
+                logger.info(f"Job {job_id}: done ({len(html)} chars)")
+            else:
+                logger.warning(f"Job {job_id}: lease lost, result discarded")
+        finally:
+            lease.cancel()
+
+
+job_store = JobStore(settings.JOBS_DB_PATH, settings.JOBS_LEASE_SECONDS, settings.JOBS_MAX_ATTEMPTS)
+job_workers = JobWorkers(job_store, settings.JOBS_WORKERS, settings.JOBS_POLL_INTERVAL_SECONDS,
+                         settings.JOBS_RETENTION_HOURS * 3600)
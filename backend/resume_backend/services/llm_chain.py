@@ -1,31 +1,31 @@
-from langchain_groq import ChatGroq
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import StrOutputParser
+from functools import lru_cache
 from resume_backend.core.config import settings
+from resume_backend.core.metrics import llm_tokens, llm_tokens_per_second, observe_stage, prompt_tokens_saved, timed
+from resume_backend.services.cache import SingleFlight, TieredCache
+from resume_backend.services.compaction import COMPACTION_VERSION, compact_job_description, compact_resume, count_tokens
+from resume_backend.services.llm_client import RateLimitedLLM, estimate_tokens
+from resume_backend.services.html_compaction import HTML_COMPACTION_VERSION, compact_html, strip_placeholders
+from resume_backend.services.html_renderer import get_template, render_resume_html, template_source
+from resume_backend.services.resume_schema import EducationSection, Experience, ProfileSection, ProjectsSection, ResumeData
+from resume_backend.services.resume_sections import split_resume
+from pydantic import BaseModel, ValidationError
+import asyncio
+import hashlib
+import logging
 import re
+import time
 
-# Attempt to fix Pydantic v2 issue with runtime patch
-try:
-    from langchain_core.caches import BaseCache
-    from langchain_core.callbacks import Callbacks
-    import langchain_groq.chat_models
-    langchain_groq.chat_models.BaseCache = BaseCache
-    langchain_groq.chat_models.Callbacks = Callbacks
-    if hasattr(ChatGroq, "model_rebuild"):
-        ChatGroq.model_rebuild()
-except Exception as e:
-    print(f"Warning: Failed to patch ChatGroq: {e}")
-
-llm = ChatGroq(
-    model=settings.GROQ_MODEL,
-    temperature=0.3,
-    max_tokens=8192,
-    api_key=settings.GROQ_API_KEY,
-)
+logger = logging.getLogger(__name__)
 
-SYSTEM_PROMPT = """
-You are a professional resume ghostwriter. You receive a candidate's RESUME and a JOB DESCRIPTION. Your job is to produce a single, complete, ATS-optimized HTML resume that looks purpose-built for the JD.
+llm_client = RateLimitedLLM(
+    requests_per_minute=settings.GROQ_REQUESTS_PER_MINUTE,
+    tokens_per_minute=settings.GROQ_TOKENS_PER_MINUTE,
+    max_concurrency=settings.GROQ_MAX_CONCURRENCY,
+    queue_timeout=settings.GROQ_QUEUE_TIMEOUT_SECONDS,
+    max_retries=settings.GROQ_MAX_RETRIES,
+)
 
+JD_STEP = """
 ## STEP 1 — ANALYZE THE JD FIRST (do this mentally before writing anything)
 
 Extract from the JD:
@@ -33,7 +33,24 @@ Extract from the JD:
 - 3–5 core responsibilities
 - Seniority signals (lead, manage, own, scale, architect, etc.)
 - Industry-specific verbs and terminology
+"""
+
+# Two-phase mode: the JD was already analyzed once per posting (ANALYSIS_PROMPT)
+ANALYSIS_STEP = """
+## STEP 1 — READ THE JOB ANALYSIS
+
+Treat it as the JD: its skills, responsibilities and terminology are what every section must target.
+"""
+
+ANALYZE_JD_STEP = """
+You are a professional resume ghostwriter. You receive a candidate's RESUME and a JOB DESCRIPTION. Your job is to produce a single, complete, ATS-optimized HTML resume that looks purpose-built for the JD.
+""" + JD_STEP
 
+USE_ANALYSIS_STEP = """
+You are a professional resume ghostwriter. You receive a candidate's RESUME and a JOB ANALYSIS: the role, top skills, core responsibilities, seniority signals and terminology of the job description (JD), extracted beforehand. Your job is to produce a single, complete, ATS-optimized HTML resume that looks purpose-built for the JD.
+""" + ANALYSIS_STEP
+
+WRITING_STEPS = """
 ## STEP 2 — PLAN THE FABRICATION (do this mentally before writing anything)
 
 For EVERY job in the resume, ask:
@@ -77,7 +94,12 @@ If the original resume is in a completely different field:
 - Certifications — you may add 1–2 plausible certifications relevant to the JD
 
 ---
+"""
 
+# Shared by the HTML and JSON generation modes
+WRITING_GUIDELINES = ANALYZE_JD_STEP + WRITING_STEPS
+
+HTML_OUTPUT_RULES = """
 ## OUTPUT RULES
 - Output ONLY the raw HTML — nothing before it, nothing after it
 - No markdown fences, no explanation, no comments outside the HTML
@@ -235,49 +257,564 @@ Replace every {{PLACEHOLDER}} with real content. Do not alter any CSS value, tag
 ```
 """
 
+SYSTEM_PROMPT = WRITING_GUIDELINES + HTML_OUTPUT_RULES
+
 
-prompt = ChatPromptTemplate.from_messages([
-    ("system", SYSTEM_PROMPT),
-    ("human", "## RESUME:\n{resume_markdown}\n\n## JOB DESCRIPTION:\n{job_description}"),
-])
+# JSON mode: the model fills a compact schema and templates/resume.html.j2 supplies
+# all markup and inline CSS, so none of it is sent to or generated by the model.
+JSON_OUTPUT_RULES = """
+## OUTPUT RULES
+- Output ONLY one JSON object — no markdown fences, no explanation
+- Values are plain text: no HTML tags, no markdown, no {{PLACEHOLDER}} text
+- One "experience" entry per role, most recent first; 4–5 bullets each
+- Use [] for projects or certifications the resume does not have (unless you added plausible certifications)
+- Use "" for any contact field or skills category with no content
+
+## JSON SHAPE
+{{"full_name": "", "contact": {{"location": "", "phone": "", "email": "", "linkedin": "", "website": ""}},
+"summary": "", "competencies": ["9 JD keywords"],
+"experience": [{{"company": "", "location": "", "title": "", "start_date": "", "end_date": "", "bullets": [""]}}],
+"skills": {{"languages": "", "frameworks": "", "cloud_devops": "", "databases": "", "tools": "", "methodologies": ""}},
+"projects": [{{"name": "", "tech_stack": "", "bullets": [""]}}],
+"education": [{{"institution": "", "location": "", "degree": "", "graduation_date": ""}}],
+"certifications": [{{"name": "", "issuer": "", "year": ""}}]}}
+"""
 
-resume_chain = prompt | llm | StrOutputParser()
+JSON_SYSTEM_PROMPT = WRITING_GUIDELINES + JSON_OUTPUT_RULES
 
-async def generate_optimized_html(resume_markdown: str, job_description: str, hide_contact_details: bool = False) -> str:
-    # Truncate inputs if necessary
-    if len(resume_markdown) > 50000:
-        resume_markdown = resume_markdown[:50000] + "...(truncated)"
-    if len(job_description) > 20000:
-        job_description = job_description[:20000] + "...(truncated)"
+# Rewrite prompts by chain name; "_analyzed" variants take the cached JD analysis
+# in place of the raw job description
+SYSTEM_PROMPTS = {
+    "html": SYSTEM_PROMPT,
+    "json": JSON_SYSTEM_PROMPT,
+    "html_analyzed": USE_ANALYSIS_STEP + WRITING_STEPS + HTML_OUTPUT_RULES,
+    "json_analyzed": USE_ANALYSIS_STEP + WRITING_STEPS + JSON_OUTPUT_RULES,
+}
+
+HUMAN_PROMPT = "## RESUME:\n{resume_markdown}\n\n## JOB DESCRIPTION:\n{job_description}"
+ANALYZED_HUMAN_PROMPT = "## RESUME:\n{resume_markdown}\n\n## JOB ANALYSIS:\n{job_description}"
+
+# Phase one of the two-phase chain: run once per posting, cached by normalized JD
+ANALYSIS_PROMPT = """
+You analyze job descriptions for a resume ghostwriter. Read the JOB DESCRIPTION and write a compact analysis that the ghostwriter will use instead of the full posting.
+
+## ANALYSIS FORMAT
+Role: <title and seniority level>
+Top skills: <8–10 required skills and tools, most important first, comma-separated>
+Responsibilities: <3–5 core responsibilities, semicolon-separated>
+Seniority signals: <e.g. lead, own, scale, architect; or none>
+Terminology: <industry-specific verbs and terms to mirror, comma-separated>
+
+## OUTPUT RULES
+- Output ONLY these five lines — no preamble, no markdown
+- Use the posting's exact wording for skills and terminology
+- At most 150 words in total
+"""
+ANALYSIS_HUMAN_PROMPT = "## JOB DESCRIPTION:\n{job_description}"
+
+# Sections mode: one call per resume section, all in flight at once, each returning
+# its part of the JSON schema. Output stays small per call, so long resumes neither
+# take one long serial generation nor run into the model's max_tokens.
+SECTION_INTRO = """
+You are a professional resume ghostwriter. You receive ONE SECTION of a candidate's RESUME and a JOB DESCRIPTION. The other sections are written at the same time by other writers; write only this one, so that it looks purpose-built for the JD.
+"""
+
+ANALYZED_SECTION_INTRO = """
+You are a professional resume ghostwriter. You receive ONE SECTION of a candidate's RESUME and a JOB ANALYSIS: the role, top skills, core responsibilities, seniority signals and terminology of the job description (JD), extracted beforehand. The other sections are written at the same time by other writers; write only this one, so that it looks purpose-built for the JD.
+"""
+
+SECTION_OUTPUT_RULES = """
+## OUTPUT RULES
+- Output ONLY one JSON object in the shape below — no markdown fences, no explanation
+- Values are plain text: no HTML tags, no markdown, no {{PLACEHOLDER}} text
+"""
+
+SECTION_SHAPES = {
+    "profile": """- The section holds the candidate's header, summary and skills; ROLES lists their jobs for context
+- Use [] for certifications the resume does not have (unless you added plausible certifications)
+- Use "" for any contact field or skills category with no content
+
+## SECTION SHAPE (profile)
+{{"full_name": "", "contact": {{"location": "", "phone": "", "email": "", "linkedin": "", "website": ""}},
+"summary": "", "competencies": ["9 JD keywords"],
+"skills": {{"languages": "", "frameworks": "", "cloud_devops": "", "databases": "", "tools": "", "methodologies": ""}},
+"certifications": [{{"name": "", "issuer": "", "year": ""}}]}}
+""",
+    "experience": """- The section is one role: keep its company, location, title and dates; write 4–5 bullets
+
+## SECTION SHAPE (experience)
+{{"company": "", "location": "", "title": "", "start_date": "", "end_date": "", "bullets": [""]}}
+""",
+    "projects": """- One entry per project in the section, in the same order; 2–3 bullets each
+
+## SECTION SHAPE (projects)
+{{"projects": [{{"name": "", "tech_stack": "", "bullets": [""]}}]}}
+""",
+    "education": """- One entry per degree in the section, in the same order
+
+## SECTION SHAPE (education)
+{{"education": [{{"institution": "", "location": "", "degree": "", "graduation_date": ""}}]}}
+""",
+}
+
+# Section prompts by kind, plus "_analyzed" variants as for SYSTEM_PROMPTS
+SECTION_PROMPTS = {
+    kind: SECTION_INTRO + JD_STEP + WRITING_STEPS + SECTION_OUTPUT_RULES + shape
+    for kind, shape in SECTION_SHAPES.items()
+} | {
+    kind + "_analyzed": ANALYZED_SECTION_INTRO + ANALYSIS_STEP + WRITING_STEPS + SECTION_OUTPUT_RULES + shape
+    for kind, shape in SECTION_SHAPES.items()
+}
+
+SECTION_HUMAN_PROMPT = "## RESUME SECTION:\n{section}\n\n## JOB DESCRIPTION:\n{job_description}"
+ANALYZED_SECTION_HUMAN_PROMPT = "## RESUME SECTION:\n{section}\n\n## JOB ANALYSIS:\n{job_description}"
+
+
+@lru_cache(maxsize=1)
+def _chains() -> dict:
+    # LangChain and the provider SDK are imported and the model client is built on
+    # first use (normally by warm_up at startup), not when this module is imported
+    from langchain_core.output_parsers import StrOutputParser
+    from langchain_core.prompts import ChatPromptTemplate
+    from resume_backend.services.llm_provider import create_chat_model
+
+    llm = create_chat_model()
+    chains = {}
+    for name, system_prompt in SYSTEM_PROMPTS.items():
+        human_prompt = ANALYZED_HUMAN_PROMPT if name.endswith("_analyzed") else HUMAN_PROMPT
+        model = llm.bind(response_format={"type": "json_object"}) if name.startswith("json") else llm
+        prompt = ChatPromptTemplate.from_messages([("system", system_prompt), ("human", human_prompt)])
+        chains[name] = prompt | model | StrOutputParser()
+    analysis_prompt = ChatPromptTemplate.from_messages([("system", ANALYSIS_PROMPT), ("human", ANALYSIS_HUMAN_PROMPT)])
+    chains["jd_analysis"] = analysis_prompt | llm.bind(max_tokens=settings.JD_ANALYSIS_MAX_TOKENS) | StrOutputParser()
+    section_model = llm.bind(response_format={"type": "json_object"}, max_tokens=settings.SECTION_MAX_TOKENS)
+    for kind, system_prompt in SECTION_PROMPTS.items():
+        human_prompt = ANALYZED_SECTION_HUMAN_PROMPT if kind.endswith("_analyzed") else SECTION_HUMAN_PROMPT
+        prompt = ChatPromptTemplate.from_messages([("system", system_prompt), ("human", human_prompt)])
+        chains["section_" + kind] = prompt | section_model | StrOutputParser()
+    return chains
+
+def _rewrite_chain(kind: str) -> tuple[str, str]:
+    # Chain name and system prompt for "html" or "json" generation: the two-phase
+    # variant, fed the JD analysis, when JD_ANALYSIS_ENABLED is set
+    name = kind + "_analyzed" if settings.JD_ANALYSIS_ENABLED else kind
+    return name, SYSTEM_PROMPTS[name]
+
+def _section_chain(kind: str) -> tuple[str, str]:
+    # Same as _rewrite_chain for one section kind (profile, experience, ...)
+    kind = kind + "_analyzed" if settings.JD_ANALYSIS_ENABLED else kind
+    return "section_" + kind, SECTION_PROMPTS[kind]
+
+def warm_up():
+    # Everything the first request would otherwise load: LangChain, the model
+    # client, the tokenizer and the resume template
+    _chains()
+    count_tokens("")
+    get_template()
+
+async def open_connections(count: int):
+    # Pre-opens keep-alive connections to the LLM API (Groq only)
+    from resume_backend.services.llm_provider import open_groq_connections
+    await open_groq_connections(count)
+
+async def close_connections():
+    if _chains.cache_info().currsize:
+        from resume_backend.services.llm_provider import close_groq_connections
+        await close_groq_connections()
+
+# Part of the result cache key, so editing the prompt invalidates old results
+PROMPT_VERSION = hashlib.sha256(
+    ("".join(SYSTEM_PROMPTS.values()) + "".join(SECTION_PROMPTS.values()) + ANALYSIS_PROMPT
+     + template_source()).encode("utf-8")
+).hexdigest()[:16]
+
+result_cache = TieredCache(
+    "result",
+    max_bytes=settings.RESULT_CACHE_MAX_MB * 1024 * 1024,
+    ttl_seconds=settings.RESULT_CACHE_TTL_SECONDS,
+    db_path=settings.RESULT_CACHE_DB_PATH or None,
+    max_disk_bytes=settings.RESULT_CACHE_MAX_DISK_MB * 1024 * 1024,
+)
+# A generation nobody waits for any more (clients gone, batch cancelled) stops spending quota
+_inflight = SingleFlight(cancel_abandoned=True)
+
+# Phase one results, shared by every resume tailored to the same posting
+jd_analysis_cache = TieredCache(
+    "jd_analysis",
+    max_bytes=settings.JD_ANALYSIS_CACHE_MAX_MB * 1024 * 1024,
+    ttl_seconds=settings.JD_ANALYSIS_TTL_SECONDS,
+    db_path=settings.JD_ANALYSIS_CACHE_DB_PATH or None,
+    max_disk_bytes=settings.JD_ANALYSIS_CACHE_MAX_DISK_MB * 1024 * 1024,
+)
+_analysis_inflight = SingleFlight(cancel_abandoned=True)
+
+_WHITESPACE = re.compile(r"\s+")
+
+def result_cache_key(resume_markdown: str, job_description: str, hide_contact_details: bool = False) -> str:
+    digest = hashlib.sha256()
+    html_compaction = f"{HTML_COMPACTION_VERSION}:{'on' if settings.COMPACT_HTML else 'off'}"
+    for part in (settings.LLM_PROVIDER, settings.GROQ_MODEL, settings.GENERATION_MODE, PROMPT_VERSION, COMPACTION_VERSION,
+                 html_compaction, str(settings.JD_ANALYSIS_ENABLED), str(hide_contact_details), resume_markdown,
+                 job_description):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+def jd_analysis_key(compacted_job_description: str) -> str:
+    # Case and whitespace do not change the analysis; boilerplate is already gone
+    normalized = _WHITESPACE.sub(" ", compacted_job_description).strip().lower()
+    digest = hashlib.sha256()
+    for part in (settings.LLM_PROVIDER, settings.GROQ_MODEL, PROMPT_VERSION, COMPACTION_VERSION, normalized):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+async def analyze_job_description(compacted_job_description: str) -> tuple[str, bool]:
+    # Phase one of the two-phase chain: role, skills, responsibilities and terminology
+    # of the posting, generated once and reused for every candidate. Returns the
+    # analysis and whether it came from the cache.
+    key = jd_analysis_key(compacted_job_description)
+    cached = await jd_analysis_cache.aget(key)
+    if cached is not None:
+        return cached.decode("utf-8"), True
+
+    async def generate() -> str:
+        inputs = {"job_description": compacted_job_description}
+        analysis = await llm_client.call(
+            lambda: _timed_invoke(_chains()["jd_analysis"], ANALYSIS_PROMPT, inputs, stage="jd_analysis"),
+            _quota_tokens(ANALYSIS_PROMPT, inputs, settings.JD_ANALYSIS_MAX_TOKENS))
+        analysis = analysis.strip()
+        if not analysis:
+            raise RuntimeError("Model returned an empty job description analysis")
+        await jd_analysis_cache.aset(key, analysis.encode("utf-8"))
+        return analysis
+
+    # Candidates applying to a posting nobody has analyzed yet share one call
+    return await _analysis_inflight.do(key, generate), False
+
+async def _build_chain_inputs(resume_markdown: str, job_description: str, hide_contact_details: bool = False) -> dict:
+    # Clean up extraction noise and boilerplate, then cut both to their token budgets
+    with timed("compact"):
+        resume = compact_resume(resume_markdown)
+        jd = compact_job_description(job_description)
+    saved = resume.tokens_saved + jd.tokens_saved
+    prompt_tokens_saved.inc(saved)
+    logger.info(f"Compaction saved {saved} prompt tokens (resume {resume.tokens_before} -> {resume.tokens_after}, "
+                f"job description {jd.tokens_before} -> {jd.tokens_after})")
+    resume_markdown, job_description = resume.text, jd.text
+
+    if settings.JD_ANALYSIS_ENABLED:
+        # Two-phase: the rewrite step gets the posting's analysis instead of the posting
+        job_description, cached = await analyze_job_description(job_description)
+        logger.info(f"Job description analysis {'cache hit' if cached else 'generated'} "
+                    f"({jd.tokens_after} -> {count_tokens(job_description)} tokens)")
 
     # Add contact details instruction to prompt
     contact_instruction = ""
     if hide_contact_details:
         contact_instruction = "\n\nIMPORTANT: DO NOT include any contact information (email, phone, address, LinkedIn, GitHub, portfolio links, or any social media links) in the output. Only include the candidate's name."
 
-    html = await resume_chain.ainvoke({
+    return {
         "resume_markdown": resume_markdown,
         "job_description": job_description + contact_instruction,
-    })
-    html = html.strip()
-    
-    # Clean up markdown code blocks if present
-    if html.startswith("```"):
-        lines = html.split("\n")
-        # Remove first line with ```html or ```
-        if lines[0].strip().startswith("```"):
-            lines = lines[1:]
-        # Remove last line with ```
-        if lines and lines[-1].strip() == "```":
-            lines = lines[:-1]
-        html = "\n".join(lines)
-
-    print("--------------")
-    print(html)
-    print("--------------")
-
-    pattern = r"```html\s*(.*?)```"
-    match = re.search(pattern, html, re.DOTALL | re.IGNORECASE)
-    return match.group(1).strip() if match else html.strip()
-            
-    #return html.strip()
+    }
+
+def _prompt_tokens(system_prompt: str, inputs: dict) -> int:
+    return estimate_tokens(system_prompt) + sum(estimate_tokens(value) for value in inputs.values())
+
+def _quota_tokens(system_prompt: str, inputs: dict, completion_tokens: int | None = None) -> int:
+    # What one call is expected to cost against the tokens-per-minute quota
+    if completion_tokens is None:
+        completion_tokens = settings.GROQ_COMPLETION_TOKENS_ESTIMATE
+    return _prompt_tokens(system_prompt, inputs) + completion_tokens
+
+
+def _record_llm_call(started: float, first_token: float | None, text: str, usage,
+                     system_prompt: str, inputs: dict, stage: str = "llm"):
+    finished = time.perf_counter()
+    observe_stage(f"{stage}_total", finished - started)
+    # Fall back to the quota estimate when the provider does not report usage
+    tokens_in = usage.input_tokens or _prompt_tokens(system_prompt, inputs)
+    tokens_out = usage.output_tokens or estimate_tokens(text)
+    llm_tokens.inc(tokens_in, "in")
+    llm_tokens.inc(tokens_out, "out")
+    generating = finished - (first_token if first_token is not None else started)
+    if generating > 0:
+        llm_tokens_per_second.observe(tokens_out / generating)
+
+async def _timed_stream(chain, system_prompt: str, inputs: dict):
+    # One LLM attempt, streamed, recording time to first token, total time and tokens
+    from resume_backend.services.llm_provider import UsageCallback
+
+    usage = UsageCallback()
+    started = time.perf_counter()
+    first_token = None
+    parts = []
+    async for chunk in chain.astream(inputs, config={"callbacks": [usage]}):
+        if first_token is None:
+            first_token = time.perf_counter()
+            observe_stage("llm_ttft", first_token - started)
+        parts.append(chunk)
+        yield chunk
+    _record_llm_call(started, first_token, "".join(parts), usage, system_prompt, inputs)
+
+async def _timed_invoke(chain, system_prompt: str, inputs: dict, stage: str = "llm") -> str:
+    from resume_backend.services.llm_provider import UsageCallback
+
+    usage = UsageCallback()
+    started = time.perf_counter()
+    text = await chain.ainvoke(inputs, config={"callbacks": [usage]})
+    _record_llm_call(started, None, text, usage, system_prompt, inputs, stage)
+    return text
+
+async def _collect(stream) -> str:
+    return "".join([chunk async for chunk in stream])
+
+async def generate_optimized_html(resume_markdown: str, job_description: str, hide_contact_details: bool = False) -> str:
+    key = result_cache_key(resume_markdown, job_description, hide_contact_details)
+    cached = await result_cache.aget(key)
+    if cached is not None:
+        return cached.decode("utf-8")
+
+    async def generate():
+        if settings.GENERATION_MODE == "json":
+            html = await _generate_structured_html(resume_markdown, job_description, hide_contact_details)
+        elif settings.GENERATION_MODE == "sections":
+            html = await _generate_sectioned_html(resume_markdown, job_description, hide_contact_details)
+        else:
+            html = await _generate_optimized_html(resume_markdown, job_description, hide_contact_details)
+        html = _finish_html(html)
+        await result_cache.aset(key, html.encode("utf-8"))
+        return html
+
+    # Identical requests already in flight (double-clicks, retries) share one LLM call
+    return await _inflight.do(key, generate)
+
+def _finish_html(html: str) -> str:
+    html = strip_placeholders(html)
+    if settings.COMPACT_HTML:
+        with timed("html_compact"):
+            html = compact_html(html)
+    return html
+
+async def _generate_optimized_html(resume_markdown: str, job_description: str, hide_contact_details: bool = False) -> str:
+    inputs = await _build_chain_inputs(resume_markdown, job_description, hide_contact_details)
+    name, system_prompt = _rewrite_chain("html")
+    # Consumed as a stream (same result as ainvoke) so time to first token is measured too
+    html = await llm_client.call(lambda: _collect(_timed_stream(_chains()[name], system_prompt, inputs)),
+                                 _quota_tokens(system_prompt, inputs))
+
+    with timed("postprocess"):
+        html = html.strip()
+
+        # Clean up markdown code blocks if present
+        if html.startswith("```"):
+            lines = html.split("\n")
+            # Remove first line with ```html or ```
+            if lines[0].strip().startswith("```"):
+                lines = lines[1:]
+            # Remove last line with ```
+            if lines and lines[-1].strip() == "```":
+                lines = lines[:-1]
+            html = "\n".join(lines)
+
+        if settings.DEBUG_LOG_CONTENT:
+            logger.info(f"Generated HTML:\n{html}")
+
+        pattern = r"```html\s*(.*?)```"
+        match = re.search(pattern, html, re.DOTALL | re.IGNORECASE)
+        return match.group(1).strip() if match else html.strip()
+
+async def _generate_structured_html(resume_markdown: str, job_description: str, hide_contact_details: bool = False) -> str:
+    inputs = await _build_chain_inputs(resume_markdown, job_description, hide_contact_details)
+    return await _structured_html(inputs, hide_contact_details)
+
+async def _structured_html(inputs: dict, hide_contact_details: bool) -> str:
+    name, system_prompt = _rewrite_chain("json")
+    # Not streamed: the JSON is only usable once complete, so there is no first token to time
+    raw = await llm_client.call(lambda: _timed_invoke(_chains()[name], system_prompt, inputs),
+                                _quota_tokens(system_prompt, inputs))
+    with timed("postprocess"):
+        return render_resume_html(_parse_json(raw, ResumeData, "resume"), hide_contact_details)
+
+def _parse_json(raw: str, model: type[BaseModel], what: str):
+    # Tolerate a stray fence or sentence around the object
+    start, end = raw.find("{"), raw.rfind("}")
+    if start == -1 or end < start:
+        raise RuntimeError(f"Model did not return a JSON {what}")
+    try:
+        return model.model_validate_json(raw[start:end + 1])
+    except ValidationError as e:
+        raise RuntimeError(f"Model returned an invalid JSON {what}: {e.error_count()} validation errors")
+
+async def _generate_sectioned_html(resume_markdown: str, job_description: str, hide_contact_details: bool = False) -> str:
+    inputs = await _build_chain_inputs(resume_markdown, job_description, hide_contact_details)
+    sections = split_resume(inputs["resume_markdown"])
+    if not sections.experience:
+        logger.info("No experience section found, generating the resume in one call")
+        return await _structured_html(inputs, hide_contact_details)
+    if sections.role_headers and len(sections.experience) != sections.role_headers:
+        # The splitter merged or broke up roles: an experience call would return one role
+        # for several, or invent one from a stray bullet
+        logger.info(f"Found {sections.role_headers} role headers but {len(sections.experience)} experience blocks, "
+                    f"generating the resume in one call")
+        return await _structured_html(inputs, hide_contact_details)
+
+    # Per request on top of llm_client's process-wide limit, so one long resume
+    # cannot take every slot
+    limit = asyncio.Semaphore(settings.SECTION_MAX_CONCURRENCY)
+
+    async def generate(kind: str, section: str, model: type[BaseModel]):
+        if not section:
+            return model()
+        name, system_prompt = _section_chain(kind)
+        section_inputs = {"section": section, "job_description": inputs["job_description"]}
+        async with limit:
+            raw = await llm_client.call(
+                lambda: _timed_invoke(_chains()[name], system_prompt, section_inputs, stage="section"),
+                _quota_tokens(system_prompt, section_inputs, settings.SECTION_MAX_TOKENS))
+        return _parse_json(raw, model, f"{kind} section")
+
+    # The summary is written without the roles' bullets; their header lines give it the career outline
+    roles = "\n".join(block.split("\n", 1)[0] for block in sections.experience)
+    profile = f"{sections.header}\n\n{sections.profile}\n\nROLES:\n{roles}".strip()
+    tasks = [
+        asyncio.ensure_future(generate("profile", profile, ProfileSection)),
+        asyncio.ensure_future(generate("projects", sections.projects, ProjectsSection)),
+        asyncio.ensure_future(generate("education", sections.education, EducationSection)),
+        *(asyncio.ensure_future(generate("experience", block, Experience)) for block in sections.experience),
+    ]
+    with timed("sections"):
+        try:
+            profile, projects, education, *experience = await asyncio.gather(*tasks)
+        except BaseException:
+            # gather leaves the other calls running when one fails; the request is
+            # lost either way, so stop them holding slots and spending quota
+            for task in tasks:
+                task.cancel()
+            raise
+    logger.info(f"Generated the resume in {len(experience) + 3} section calls ({len(experience)} roles)")
+
+    with timed("postprocess"):
+        resume = ResumeData(**profile.model_dump(), experience=experience, projects=projects.projects,
+                            education=education.education)
+        return render_resume_html(resume, hide_contact_details)
+
+
+class FenceStripper:
+    # Incremental version of the fence cleanup above: drops an opening ```html line
+    # (and any chatter before it) and stops at the closing ``` line, emitting only
+    # complete lines so a fence is never split across two chunks.
+    MAX_PREAMBLE_CHARS = 2000
+
+    def __init__(self):
+        self._buffer = ""
+        self._started = False
+        self._closed = False
+
+    def feed(self, chunk: str) -> str:
+        if self._closed:
+            return ""
+        self._buffer += chunk
+        if not self._started and not self._find_start():
+            return ""
+
+        complete, sep, self._buffer = self._buffer.rpartition("\n")
+        if not sep:
+            return ""
+        out = []
+        for line in complete.split("\n"):
+            if line.strip() == "```":
+                self._closed = True
+                self._buffer = ""
+                break
+            out.append(line + "\n")
+        return "".join(out)
+
+    def finish(self) -> str:
+        if self._closed:
+            return ""
+        rest, self._buffer = self._buffer, ""
+        if not self._started:
+            rest = rest.lstrip()
+            if rest.startswith("```"):
+                rest = rest.split("\n", 1)[1] if "\n" in rest else ""
+        rest = rest.rstrip()
+        if rest.endswith("```"):
+            rest = rest[:-3].rstrip()
+        return rest
+
+    def _find_start(self) -> bool:
+        stripped = self._buffer.lstrip()
+        if not stripped:
+            return False
+        if stripped.startswith("<"):
+            self._buffer = stripped
+        elif stripped.startswith("`"):
+            # Opening fence: wait for the end of the ```html line, then drop it
+            if "\n" not in stripped:
+                return False
+            self._buffer = stripped.split("\n", 1)[1]
+        else:
+            # Preamble before a fenced block, e.g. "Here is your resume:\n```html"
+            match = re.search(r"^```[^\n]*\n", stripped, re.MULTILINE)
+            if match:
+                self._buffer = stripped[match.end():]
+            elif len(stripped) < self.MAX_PREAMBLE_CHARS and "<" not in stripped:
+                return False
+            else:
+                self._buffer = stripped
+        self._started = True
+        return True
+
+
+async def stream_optimized_html(resume_markdown: str, job_description: str, hide_contact_details: bool = False):
+    if settings.GENERATION_MODE != "html":
+        # The HTML only exists once the whole JSON object has been rendered
+        yield await generate_optimized_html(resume_markdown, job_description, hide_contact_details)
+        return
+
+    key = result_cache_key(resume_markdown, job_description, hide_contact_details)
+    cached = await result_cache.aget(key)
+    if cached is not None:
+        yield cached.decode("utf-8")
+        return
+
+    queue: asyncio.Queue[str | None] = asyncio.Queue()
+
+    async def generate():
+        stripper = FenceStripper()
+        parts = []
+        try:
+            inputs = await _build_chain_inputs(resume_markdown, job_description, hide_contact_details)
+            name, system_prompt = _rewrite_chain("html")
+            async for chunk in llm_client.stream(lambda: _timed_stream(_chains()[name], system_prompt, inputs),
+                                                 _quota_tokens(system_prompt, inputs)):
+                html = stripper.feed(chunk)
+                if html:
+                    parts.append(html)
+                    queue.put_nowait(html)
+            tail = stripper.finish()
+            if tail:
+                parts.append(tail)
+                queue.put_nowait(tail)
+        finally:
+            queue.put_nowait(None)
+        # The streaming client already has the HTML; duplicates and later cache hits get it finished
+        html = _finish_html("".join(parts).strip())
+        await result_cache.aset(key, html.encode("utf-8"))
+        return html
+
+    # Registered like generate_optimized_html's calls, so identical requests share one
+    # LLM call. One that joins a generation already in flight gets its HTML in one chunk.
+    task, started = _inflight.join(key, generate)
+    try:
+        if not started:
+            yield await asyncio.shield(task)
+            return
+        while (html := await queue.get()) is not None:
+            yield html
+        await asyncio.shield(task)
+    finally:
+        # Cancels the generation if this client went away and nobody else waits for it
+        _inflight.leave(key, task)
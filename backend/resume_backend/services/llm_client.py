@@ -0,0 +1,186 @@
+import asyncio
+import logging
+import math
+import random
+import time
+from resume_backend.core.errors import ServiceBusyError
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    # Refills continuously at capacity per minute
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self._level = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._level = min(self.capacity, self._level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount: float) -> float:
+        self._refill()
+        amount = min(amount, self.capacity)
+        return 0.0 if self._level >= amount else (amount - self._level) / self.rate
+
+    def take(self, amount: float):
+        self._refill()
+        self._level -= min(amount, self.capacity)
+
+
+class RateLimitedLLM:
+    # Client-side guard in front of the Groq API:
+    # - request and token buckets sized to the account's RPM/TPM quotas
+    # - adaptive concurrency (AIMD): halve the in-flight limit and pause on 429,
+    #   grow it back by one slot per "window" of successful calls
+    # - jittered exponential retries for 429/5xx/connection errors, honoring retry-after
+    # - callers that cannot get a slot within queue_timeout fail fast with ServiceBusyError
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int, max_concurrency: int,
+                 queue_timeout: float, max_retries: int, backoff_base: float = 0.5, backoff_cap: float = 20.0):
+        self.max_concurrency = max_concurrency
+        self.queue_timeout = queue_timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self._requests = TokenBucket(requests_per_minute)
+        self._tokens = TokenBucket(tokens_per_minute)
+        self._limit = float(max_concurrency)
+        self._active = 0
+        self._paused_until = 0.0
+        self._slot_freed: asyncio.Event | None = None
+
+    def _wait_time(self, tokens: int) -> float:
+        now = time.monotonic()
+        if self._paused_until > now:
+            return self._paused_until - now
+        if self._active >= int(self._limit):
+            return math.inf  # until a slot is released
+        return max(self._requests.wait_time(1), self._tokens.wait_time(tokens))
+
+    async def _acquire(self, tokens: int):
+        if self._slot_freed is None:
+            self._slot_freed = asyncio.Event()
+        deadline = time.monotonic() + self.queue_timeout
+        while True:
+            wait = self._wait_time(tokens)
+            if wait == 0:
+                self._requests.take(1)
+                self._tokens.take(tokens)
+                self._active += 1
+                return
+            remaining = deadline - time.monotonic()
+            # A finite wait (buckets, pause) that outlasts the deadline fails fast; for a
+            # slot (infinite wait) we wait up to the deadline for one to be released
+            if remaining <= 0 or (wait != math.inf and wait > remaining):
+                retry_after = wait if wait != math.inf else self.queue_timeout
+                raise ServiceBusyError("LLM capacity exhausted, please retry shortly.",
+                                       retry_after=max(1, math.ceil(retry_after)))
+            self._slot_freed.clear()
+            try:
+                await asyncio.wait_for(self._slot_freed.wait(), timeout=min(wait, remaining))
+            except asyncio.TimeoutError:
+                pass
+
+    def _release(self):
+        self._active -= 1
+        if self._slot_freed is not None:
+            self._slot_freed.set()
+
+    def _on_success(self):
+        self._limit = min(float(self.max_concurrency), self._limit + 1.0 / self._limit)
+
+    def _on_rate_limited(self, pause: float):
+        self._limit = max(1.0, self._limit / 2)
+        self._paused_until = max(self._paused_until, time.monotonic() + pause)
+        logger.warning(f"Groq rate limit hit: concurrency limit now {int(self._limit)}, pausing {pause:.1f}s")
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+
+    def _retry_delay(self, error: Exception, attempt: int) -> float | None:
+        # None means the error is not worth retrying. groq is imported here, not at
+        # startup: it is already loaded by the time a call can fail
+        import groq
+
+        if isinstance(error, groq.RateLimitError):
+            retry_after = _retry_after_seconds(error)
+            delay = retry_after if retry_after is not None else self._backoff(attempt)
+            self._on_rate_limited(delay)
+            return delay
+        if isinstance(error, (groq.APIConnectionError, groq.InternalServerError)):
+            return self._backoff(attempt)
+        return None
+
+    def _give_up(self, error: Exception, delay: float) -> Exception:
+        import groq
+
+        if isinstance(error, groq.RateLimitError):
+            return ServiceBusyError("LLM provider is rate limiting requests, please retry shortly.",
+                                    retry_after=max(1, math.ceil(delay)))
+        return error
+
+    async def call(self, fn, tokens: int):
+        # fn is a zero-argument coroutine factory, re-invoked on each attempt
+        for attempt in range(self.max_retries + 1):
+            await self._acquire(tokens)
+            try:
+                result = await fn()
+            except Exception as e:
+                delay = self._retry_delay(e, attempt)
+                if delay is None:
+                    raise
+                if attempt == self.max_retries:
+                    raise self._give_up(e, delay) from e
+                logger.warning(f"LLM call failed ({type(e).__name__}), retry {attempt + 1} in {delay:.1f}s")
+            else:
+                self._on_success()
+                return result
+            finally:
+                self._release()
+            await asyncio.sleep(delay)
+
+    async def stream(self, make_stream, tokens: int):
+        # Holds one slot for the whole stream; only retried if nothing was yielded yet
+        for attempt in range(self.max_retries + 1):
+            await self._acquire(tokens)
+            started = False
+            try:
+                async for chunk in make_stream():
+                    started = True
+                    yield chunk
+                self._on_success()
+                return
+            except Exception as e:
+                delay = None if started else self._retry_delay(e, attempt)
+                if delay is None:
+                    raise
+                if attempt == self.max_retries:
+                    raise self._give_up(e, delay) from e
+                logger.warning(f"LLM stream failed ({type(e).__name__}), retry {attempt + 1} in {delay:.1f}s")
+            finally:
+                self._release()
+            await asyncio.sleep(delay)
+
+    def stats(self) -> dict:
+        return {
+            "active": self._active,
+            "concurrency_limit": int(self._limit),
+            "paused_for": max(0.0, round(self._paused_until - time.monotonic(), 1)),
+        }
+
+
+def _retry_after_seconds(error: Exception) -> float | None:
+    value = error.response.headers.get("retry-after")
+    try:
+        return max(0.0, float(value)) if value is not None else None
+    except ValueError:
+        return None
+
+
+def estimate_tokens(text: str) -> int:
+    # Rough count for quota accounting (~4 characters per token for English text)
+    return len(text) // 4 + 1
@@ -0,0 +1,252 @@
+import asyncio
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from typing import Any, AsyncIterator, Iterator, Optional, Union
+import groq
+import httpx
+from langchain_core.caches import BaseCache
+from langchain_core.callbacks import AsyncCallbackHandler, Callbacks
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from resume_backend.core.config import settings
+from resume_backend.services.html_renderer import render_resume_html
+from resume_backend.services.resume_schema import ResumeData
+from resume_backend.services.resume_sections import split_resume
+
+GROQ_API_BASE = "https://api.groq.com"
+
+_SECTION_SHAPE = re.compile(r"## SECTION SHAPE \((\w+)\)")
+
+_http_client: httpx.AsyncClient | None = None
+_http_client_lock = threading.Lock()
+
+
+def create_chat_model() -> BaseChatModel:
+    # Selected by LLM_PROVIDER; everything downstream only sees a LangChain chat model
+    if settings.LLM_PROVIDER == "fake":
+        return FakeResumeChatModel(
+            time_to_first_token=settings.FAKE_LLM_TTFT_SECONDS,
+            tokens_per_second=settings.FAKE_LLM_TOKENS_PER_SECOND,
+            prefill_tokens_per_second=settings.FAKE_LLM_PREFILL_TOKENS_PER_SECOND,
+            error_rate=settings.FAKE_LLM_ERROR_RATE,
+            seed=settings.FAKE_LLM_SEED,
+        )
+    return _create_groq_model()
+
+
+def groq_http_client() -> httpx.AsyncClient:
+    # One keep-alive connection pool to the Groq API for the whole process, sized
+    # to the concurrency limit so every in-flight call can reuse a connection
+    global _http_client
+    with _http_client_lock:
+        if _http_client is None:
+            _http_client = httpx.AsyncClient(
+                base_url=GROQ_API_BASE,
+                timeout=httpx.Timeout(60.0, connect=5.0),
+                limits=httpx.Limits(max_connections=settings.GROQ_MAX_CONCURRENCY,
+                                    max_keepalive_connections=settings.GROQ_MAX_CONCURRENCY,
+                                    keepalive_expiry=settings.GROQ_KEEPALIVE_SECONDS),
+                follow_redirects=True,
+            )
+        return _http_client
+
+
+async def open_groq_connections(count: int):
+    # Opens count connections (DNS, TCP and TLS) ahead of the first LLM call with a
+    # cheap authenticated request each; they then wait in the keep-alive pool
+    if settings.LLM_PROVIDER != "groq" or count <= 0:
+        return
+    client = groq_http_client()
+    headers = {"Authorization": f"Bearer {settings.GROQ_API_KEY}"}
+    responses = await asyncio.gather(*(client.get("/openai/v1/models", headers=headers) for _ in range(count)))
+    for response in responses:
+        response.raise_for_status()
+
+
+async def close_groq_connections():
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+def _create_groq_model() -> BaseChatModel:
+    from langchain_groq import ChatGroq
+
+    if not settings.GROQ_API_KEY:
+        raise RuntimeError("GROQ_API_KEY is not set (or use LLM_PROVIDER=fake for offline runs)")
+
+    # Attempt to fix Pydantic v2 issue with runtime patch
+    try:
+        from langchain_core.caches import BaseCache
+        from langchain_core.callbacks import Callbacks
+        import langchain_groq.chat_models
+        langchain_groq.chat_models.BaseCache = BaseCache
+        langchain_groq.chat_models.Callbacks = Callbacks
+        if hasattr(ChatGroq, "model_rebuild"):
+            ChatGroq.model_rebuild()
+    except Exception as e:
+        print(f"Warning: Failed to patch ChatGroq: {e}")
+
+    return ChatGroq(
+        model=settings.GROQ_MODEL,
+        temperature=0.3,
+        max_tokens=8192,
+        api_key=settings.GROQ_API_KEY,
+        # Retries are handled by llm_client so they respect our rate limiter
+        max_retries=0,
+        http_async_client=groq_http_client(),
+    )
+
+
+class UsageCallback(AsyncCallbackHandler):
+    # Picks up the token counts the provider reports on the final message, if any
+    def __init__(self):
+        self.input_tokens: int | None = None
+        self.output_tokens: int | None = None
+
+    async def on_llm_end(self, response, **kwargs):
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                if usage:
+                    self.input_tokens = usage.get("input_tokens")
+                    self.output_tokens = usage.get("output_tokens")
+
+
+class FakeResumeChatModel(BaseChatModel):
+    # Offline stand-in for Groq with a controllable latency profile. Output is
+    # deterministic for a given prompt: a fenced HTML resume, or the JSON
+    # schema when the system prompt asks for JSON. Failures are drawn from a
+    # seeded RNG and raised as Groq 503s so the retry path is exercised too.
+
+    time_to_first_token: float = 0.4
+    tokens_per_second: float = 500.0
+    # 0: prompt length does not affect time to first token
+    prefill_tokens_per_second: float = 0.0
+    error_rate: float = 0.0
+    seed: int = 0
+    chars_per_chunk: int = 16
+
+    _rng: random.Random | None = None
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-resume"
+
+    def _maybe_fail(self):
+        if self._rng is None:
+            self._rng = random.Random(self.seed)
+        if self.error_rate and self._rng.random() < self.error_rate:
+            request = httpx.Request("POST", "http://fake-llm/openai/v1/chat/completions")
+            raise groq.InternalServerError("Fake provider error", response=httpx.Response(503, request=request),
+                                           body=None)
+
+    def _response_text(self, messages: list[BaseMessage]) -> str:
+        system, human = str(messages[0].content), str(messages[-1].content)
+        resume_text, _, jd_text = human.partition("## JOB DESCRIPTION:")
+        if not jd_text:
+            resume_text, _, jd_text = human.partition("## JOB ANALYSIS:")
+        resume_text = resume_text.replace("## RESUME SECTION:", "").replace("## RESUME:", "")
+        lines = [line.strip() for line in resume_text.splitlines() if line.strip()]
+        keywords = [w.strip(".,;:()") for w in jd_text.split() if len(w) > 5][:9] or ["Delivery"]
+        rng = random.Random(hashlib.sha256(human.encode("utf-8")).hexdigest())
+
+        if "## ANALYSIS FORMAT" in system:
+            return (f"Role: {jd_text.strip().split('.')[0][:80]}\nTop skills: {', '.join(keywords)}\n"
+                    f"Responsibilities: deliver {'; deliver '.join(keywords[:3])}\nSeniority signals: none\n"
+                    f"Terminology: {', '.join(keywords[:5])}")
+
+        def experience(i: int, company: str) -> dict:
+            return {"company": company, "location": "Remote", "title": "Engineer",
+                    "start_date": f"{2020 - 2 * i}", "end_date": "Present" if i == 0 else f"{2022 - 2 * i}",
+                    "bullets": [f"Delivered {rng.choice(keywords)} work improving throughput by ~{rng.randint(10, 60)}%"
+                                for _ in range(5)]}
+
+        # One role per experience block, as a real model would write
+        roles = len(split_resume(resume_text).experience) or max(1, min(5, len(lines) // 10))
+        resume = ResumeData(
+            full_name=lines[0] if lines else "Candidate",
+            contact={"email": "candidate@example.com", "location": "Remote"},
+            summary=" ".join(lines[1:4])[:400],
+            competencies=keywords,
+            experience=[experience(i, f"Company {i + 1}") for i in range(roles)],
+            skills={"languages": ", ".join(keywords[:4]), "tools": ", ".join(keywords[4:])},
+            education=[{"institution": "State University", "degree": "B.S.", "graduation_date": "2015"}],
+        )
+
+        section = _SECTION_SHAPE.search(system)
+        if section:
+            kind = section.group(1)
+            if kind == "experience":
+                return json.dumps(experience(0, lines[0][:60] if lines else "Company"))
+            if kind == "projects":
+                return json.dumps({"projects": [{"name": line[:60], "bullets": [f"Built it with {keywords[0]}"]}
+                                                for line in lines[1:3]]})
+            if kind == "education":
+                return resume.model_dump_json(include={"education"})
+            return resume.model_dump_json(exclude={"experience", "projects", "education"})
+        if "## JSON SHAPE" in system:
+            return resume.model_dump_json()
+        return "```html\n" + render_resume_html(resume) + "\n```"
+
+    def _chunks(self, text: str) -> Iterator[str]:
+        for i in range(0, len(text), self.chars_per_chunk):
+            yield text[i:i + self.chars_per_chunk]
+
+    def _chunk_delay(self) -> float:
+        # ~4 characters per token
+        return self.chars_per_chunk / 4 / self.tokens_per_second
+
+    def _first_token_delay(self, messages: list[BaseMessage]) -> float:
+        if not self.prefill_tokens_per_second:
+            return self.time_to_first_token
+        prompt_tokens = sum(len(str(m.content)) for m in messages) / 4
+        return self.time_to_first_token + prompt_tokens / self.prefill_tokens_per_second
+
+    def _usage(self, messages: list[BaseMessage], text: str) -> dict:
+        prompt = sum(len(str(m.content)) for m in messages) // 4
+        completion = len(text) // 4
+        return {"input_tokens": prompt, "output_tokens": completion, "total_tokens": prompt + completion}
+
+    def _generate(self, messages: list[BaseMessage], stop: list[str] | None = None, run_manager: Any = None,
+                  **kwargs: Any) -> ChatResult:
+        self._maybe_fail()
+        text = self._response_text(messages)
+        time.sleep(self._first_token_delay(messages) + len(text) / 4 / self.tokens_per_second)
+        message = AIMessage(content=text, usage_metadata=self._usage(messages, text))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(self, messages: list[BaseMessage], stop: list[str] | None = None, run_manager: Any = None,
+                         **kwargs: Any) -> ChatResult:
+        text = "".join([chunk.message.content async for chunk in self._astream(messages, stop, run_manager)])
+        message = AIMessage(content=text, usage_metadata=self._usage(messages, text))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _astream(self, messages: list[BaseMessage], stop: list[str] | None = None, run_manager: Any = None,
+                       **kwargs: Any) -> AsyncIterator[ChatGenerationChunk]:
+        self._maybe_fail()
+        text = self._response_text(messages)
+        await asyncio.sleep(self._first_token_delay(messages))
+        delay = self._chunk_delay()
+        for chunk in self._chunks(text):
+            await asyncio.sleep(delay)
+            if run_manager:
+                await run_manager.on_llm_new_token(chunk)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=chunk))
+
+    @property
+    def _identifying_params(self) -> dict:
+        return {"time_to_first_token": self.time_to_first_token, "tokens_per_second": self.tokens_per_second,
+                "prefill_tokens_per_second": self.prefill_tokens_per_second,
+                "error_rate": self.error_rate, "seed": self.seed}
+
+
+# Same Pydantic v2 forward-reference problem as the ChatGroq patch above:
+# resolve BaseChatModel's annotations against this module's imports.
+FakeResumeChatModel.model_rebuild()
@@ -0,0 +1,233 @@
+import io
+import re
+from functools import lru_cache
+from html.parser import HTMLParser
+from xml.sax.saxutils import escape
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER, TA_RIGHT
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.lib.units import inch
+from reportlab.platypus import HRFlowable, Paragraph, SimpleDocTemplate, Table, TableStyle
+
+# HTML -> PDF layout with ReportLab. Only imported by the render worker processes.
+
+BLOCK_TAGS = {"body", "div", "p", "section", "header", "ul", "ol", "li", "table", "tr",
+              "h1", "h2", "h3", "h4", "h5", "h6"}
+INLINE_TAGS = {"span", "b", "strong", "i", "em", "u", "a", "td", "th", "font", "small"}
+SKIPPED_TAGS = {"head", "style", "script", "title"}
+CELL_TAGS = {"span", "td", "th"}
+
+_FONT_SIZE = re.compile(r"font-size:(\d+(?:\.\d+)?)px")
+_WHITESPACE = re.compile(r"\s+")
+_MARKUP = re.compile(r"<[^>]+>")
+# Single-class rules, as html_compaction writes them
+_CLASS_RULE = re.compile(r"\.([\w-]+)\s*\{([^}]*)\}")
+
+_ROW_STYLE = TableStyle([
+    ("VALIGN", (0, 0), (-1, -1), "BOTTOM"),
+    ("LEFTPADDING", (0, 0), (-1, -1), 0),
+    ("RIGHTPADDING", (0, 0), (-1, -1), 0),
+    ("TOPPADDING", (0, 0), (-1, -1), 0),
+    ("BOTTOMPADDING", (0, 0), (-1, -1), 1),
+])
+
+_CELL_STYLE = TableStyle([
+    ("VALIGN", (0, 0), (-1, -1), "TOP"),
+    ("LEFTPADDING", (0, 0), (-1, -1), 0),
+    ("RIGHTPADDING", (0, 0), (-1, -1), 6),
+    ("TOPPADDING", (0, 0), (-1, -1), 1),
+    ("BOTTOMPADDING", (0, 0), (-1, -1), 1),
+])
+
+
+@lru_cache(maxsize=1)
+def _styles() -> dict[str, ParagraphStyle]:
+    # Built once per render worker process, not once per PDF
+    body = ParagraphStyle("body", fontName="Helvetica", fontSize=8.5, leading=12.5,
+                          textColor=colors.HexColor("#111111"))
+    return {
+        "body": body,
+        "name": ParagraphStyle("name", body, fontName="Helvetica-Bold", fontSize=17, leading=21,
+                               alignment=TA_CENTER, spaceAfter=2),
+        "centered": ParagraphStyle("centered", body, fontSize=8, leading=13, alignment=TA_CENTER,
+                                   textColor=colors.HexColor("#444444")),
+        "heading": ParagraphStyle("heading", body, fontName="Helvetica-Bold", fontSize=8.5, spaceBefore=8),
+        "bullet": ParagraphStyle("bullet", body, leftIndent=12, bulletIndent=3, spaceAfter=2),
+        "row_left": ParagraphStyle("row_left", body, fontSize=9),
+        "row_right": ParagraphStyle("row_right", body, fontSize=8, alignment=TA_RIGHT,
+                                    textColor=colors.HexColor("#555555")),
+        "cell": ParagraphStyle("cell", body, fontSize=8),
+    }
+
+
+class _ResumeHTMLParser(HTMLParser):
+    # Flattens the resume markup into (kind, content) blocks. content is ReportLab
+    # paragraph markup (escaped text plus <b>/<i>/<br/>), or a list of cells for
+    # the two-column rows (flex divs and table rows) of the template.
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.blocks: list[tuple[str, object]] = []
+        self._text: list[str] = []
+        self._blocks: list[list] = []  # open block elements: [tag, style, had_content]
+        self._inline: list[tuple[str, str]] = []  # open inline elements: (opening, closing) markup
+        self._cells: list[str] | None = None
+        self._cell_depth = 0
+        self._skip = 0
+        self._in_style = False
+        self._classes: dict[str, str] = {}  # class name -> declarations, from <style> blocks
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIPPED_TAGS:
+            self._skip += 1
+            self._in_style = tag == "style"
+            return
+        attrs = dict(attrs)
+        # Class declarations first, so the inline ones win as in a browser
+        style = "".join(self._classes.get(name, "") + ";" for name in (attrs.get("class") or "").split())
+        style = (style + (attrs.get("style") or "")).replace(" ", "").lower()
+        if tag == "br":
+            self._text.append("<br/>")
+        elif tag in BLOCK_TAGS:
+            self._flush()
+            self._blocks.append([tag, style, False])
+            if tag == "tr" or "display:flex" in style:
+                self._cells = []
+                self._cell_depth = 0
+        elif tag in INLINE_TAGS:
+            if self._cells is not None and tag in CELL_TAGS:
+                self._cell_depth += 1
+            bold = tag in ("b", "strong", "th") or "font-weight:700" in style or "font-weight:bold" in style
+            italic = tag in ("i", "em") or "font-style:italic" in style
+            opening = ("<b>" if bold else "") + ("<i>" if italic else "")
+            closing = ("</i>" if italic else "") + ("</b>" if bold else "")
+            self._inline.append((opening, closing))
+            self._text.append(opening)
+
+    def handle_endtag(self, tag):
+        if tag in SKIPPED_TAGS:
+            self._skip = max(0, self._skip - 1)
+            self._in_style = False
+        elif tag in BLOCK_TAGS:
+            self._end_block(tag)
+        elif tag in INLINE_TAGS and self._inline:
+            self._text.append(self._inline.pop()[1])
+            if self._cells is not None and tag in CELL_TAGS:
+                self._cell_depth -= 1
+                if self._cell_depth == 0:
+                    self._cells.append(self._take_text())
+
+    def handle_data(self, data):
+        if self._in_style:
+            self._classes.update(_CLASS_RULE.findall(data))
+        if self._skip:
+            return
+        data = _WHITESPACE.sub(" ", data)
+        if any("text-transform:uppercase" in style for _, style, _ in self._blocks):
+            data = data.upper()
+        self._text.append(escape(data))
+
+    def close(self):
+        super().close()
+        self._flush()
+
+    def _take_text(self) -> str:
+        # Close inline elements still open at a block boundary and reopen them after it
+        text = "".join(self._text) + "".join(closing for _, closing in reversed(self._inline))
+        self._text = [opening for opening, _ in self._inline]
+        return text.strip() if _MARKUP.sub("", text).strip() else ""
+
+    def _flush(self):
+        text = self._take_text()
+        if not text:
+            return
+        if self._cells is not None:
+            self._cells.append(text)
+            return
+        tag, style = self._blocks[-1][:2] if self._blocks else ("body", "")
+        self.blocks.append((self._kind(tag, style), text))
+        for block in self._blocks:
+            block[2] = True
+
+    def _end_block(self, tag: str):
+        if not self._blocks or self._blocks[-1][0] != tag:
+            return
+        if self._cells is not None and (tag == "tr" or "display:flex" in self._blocks[-1][1]):
+            text = self._take_text()
+            cells = [c for c in self._cells + [text] if c]
+            self._cells = None
+            if cells:
+                self.blocks.append(("cells" if tag == "tr" else "row", cells))
+                for block in self._blocks:
+                    block[2] = True
+        else:
+            self._flush()
+        _, style, had_content = self._blocks.pop()
+        if not had_content and "border-top" in style:
+            self.blocks.append(("rule", None))
+
+    def _kind(self, tag: str, style: str) -> str:
+        if tag == "li":
+            return "bullet"
+        size = _FONT_SIZE.search(style)
+        if tag == "h1" or (size and float(size.group(1)) >= 18):
+            return "name"
+        if tag in ("h2", "h3") or "text-transform:uppercase" in style:
+            return "heading"
+        if any("text-align:center" in s for _, s, _ in self._blocks):
+            return "centered"
+        return "body"
+
+
+def _paragraph(text: str, style: ParagraphStyle, **kwargs) -> Paragraph:
+    try:
+        return Paragraph(text, style, **kwargs)
+    except ValueError:
+        # Markup ReportLab cannot parse: keep the words, drop the formatting
+        return Paragraph(_MARKUP.sub("", text), style, **kwargs)
+
+
+def _build_story(blocks: list[tuple[str, object]], width: float) -> list:
+    styles = _styles()
+    story = []
+    previous = None
+    for kind, content in blocks:
+        if kind == "rule":
+            story.append(HRFlowable(width="100%", thickness=1.5, color=colors.HexColor("#111111"),
+                                    spaceBefore=4, spaceAfter=6))
+        elif kind == "heading":
+            story.append(_paragraph(content, styles["heading"]))
+            story.append(HRFlowable(width="100%", thickness=0.5, color=colors.HexColor("#cccccc"),
+                                    spaceBefore=1, spaceAfter=4))
+        elif kind == "bullet":
+            story.append(_paragraph(content, styles["bullet"], bulletText="•"))
+        elif kind == "row" and len(content) == 2:
+            # Company | location, title | dates: left-aligned and right-aligned halves of one line
+            cells = [_paragraph(content[0], styles["row_left"]), _paragraph(content[1], styles["row_right"])]
+            story.append(Table([cells], colWidths=[width * 0.68, width * 0.32], style=_ROW_STYLE,
+                               spaceBefore=6 if previous not in ("row", "heading") else 0))
+        elif kind in ("row", "cells"):
+            cells = [_paragraph(cell, styles["cell"] if kind == "cells" else styles["row_left"]) for cell in content]
+            widths = [width * 0.23, width * 0.77] if len(cells) == 2 else [width / len(cells)] * len(cells)
+            story.append(Table([cells], colWidths=widths, style=_CELL_STYLE))
+        else:
+            story.append(_paragraph(content, styles[kind]))
+        previous = kind
+    return story
+
+
+def build_pdf(html_content: str) -> bytes:
+    parser = _ResumeHTMLParser()
+    parser.feed(html_content)
+    parser.close()
+
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=letter, title="Resume", leftMargin=0.6 * inch,
+                            rightMargin=0.6 * inch, topMargin=0.5 * inch, bottomMargin=0.5 * inch)
+    story = _build_story(parser.blocks, doc.width)
+    if not story:
+        story.append(Paragraph("Resume content", _styles()["body"]))
+
+    doc.build(story)
+    return buffer.getvalue()
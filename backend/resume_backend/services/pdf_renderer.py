@@ -0,0 +1,66 @@
+import hashlib
+import logging
+from resume_backend.core.config import settings
+from resume_backend.core.metrics import timed
+from resume_backend.services.cache import SingleFlight, TieredCache
+from resume_backend.services.worker_pool import ProcessWorkerPool
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever the PDF layout changes so stale cache entries are ignored
+RENDERER_VERSION = "1"
+
+render_pool = ProcessWorkerPool(
+    "renderer",
+    size=settings.RENDER_POOL_SIZE,
+    timeout=settings.RENDER_TIMEOUT_SECONDS,
+    queue_limit=settings.RENDER_QUEUE_LIMIT,
+)
+
+pdf_cache = TieredCache(
+    "pdf",
+    max_bytes=settings.PDF_CACHE_MAX_MB * 1024 * 1024,
+    ttl_seconds=settings.PDF_CACHE_TTL_SECONDS,
+    db_path=settings.PDF_CACHE_DB_PATH or None,
+    max_disk_bytes=settings.PDF_CACHE_MAX_DISK_MB * 1024 * 1024,
+)
+
+_inflight = SingleFlight()
+
+
+def warm_up_worker():
+    # Run once in every render worker at startup: imports ReportLab, builds the
+    # styles and loads the fonts by laying out an empty resume
+    _compile_sync("")
+
+
+def _compile_sync(html_content: str) -> bytes:
+    # Runs in a render worker process; the API process itself never imports ReportLab
+    try:
+        from resume_backend.services.pdf_layout import build_pdf
+        return build_pdf(html_content)
+    except Exception as e:
+        raise RuntimeError(f"PDF generation failed: {str(e)}")
+
+
+def pdf_cache_key(html_content: str) -> str:
+    return f"{hashlib.sha256(html_content.encode('utf-8')).hexdigest()}:v{RENDERER_VERSION}"
+
+
+async def html_to_pdf(html_content: str) -> bytes:
+    # Cached by HTML hash, so downloading the same result again skips the render
+    key = pdf_cache_key(html_content)
+    cached = await pdf_cache.aget(key)
+    if cached is not None:
+        logger.info("PDF cache hit")
+        return cached
+
+    async def render() -> bytes:
+        with timed("pdf_render"):
+            pdf = await render_pool.run(_compile_sync, html_content)
+        await pdf_cache.aset(key, pdf)
+        return pdf
+
+    pdf = await _inflight.do(key, render)
+    logger.info(f"Rendered PDF ({len(pdf)} bytes)")
+    return pdf
@@ -0,0 +1,81 @@
+from pydantic import BaseModel, Field
+
+
+# Compact resume structure the model fills in when GENERATION_MODE=json (or, in parts, =sections).
+# Every field is plain text; markup and styling come from templates/resume.html.j2.
+
+class Contact(BaseModel):
+    location: str = ""
+    phone: str = ""
+    email: str = ""
+    linkedin: str = ""
+    website: str = ""
+
+
+class Experience(BaseModel):
+    company: str
+    location: str = ""
+    title: str = ""
+    start_date: str = ""
+    end_date: str = ""
+    bullets: list[str] = Field(default_factory=list)
+
+
+class Project(BaseModel):
+    name: str
+    tech_stack: str = ""
+    bullets: list[str] = Field(default_factory=list)
+
+
+class Education(BaseModel):
+    institution: str
+    location: str = ""
+    degree: str = ""
+    graduation_date: str = ""
+
+
+class Certification(BaseModel):
+    name: str
+    issuer: str = ""
+    year: str = ""
+
+
+class Skills(BaseModel):
+    languages: str = ""
+    frameworks: str = ""
+    cloud_devops: str = ""
+    databases: str = ""
+    tools: str = ""
+    methodologies: str = ""
+
+
+class ResumeData(BaseModel):
+    full_name: str
+    contact: Contact = Field(default_factory=Contact)
+    summary: str = ""
+    competencies: list[str] = Field(default_factory=list)
+    experience: list[Experience] = Field(default_factory=list)
+    skills: Skills = Field(default_factory=Skills)
+    projects: list[Project] = Field(default_factory=list)
+    education: list[Education] = Field(default_factory=list)
+    certifications: list[Certification] = Field(default_factory=list)
+
+
+# GENERATION_MODE=sections: each call fills one part, merged into ResumeData in
+# resume order. Experience blocks come back as a single Experience each.
+
+class ProfileSection(BaseModel):
+    full_name: str
+    contact: Contact = Field(default_factory=Contact)
+    summary: str = ""
+    competencies: list[str] = Field(default_factory=list)
+    skills: Skills = Field(default_factory=Skills)
+    certifications: list[Certification] = Field(default_factory=list)
+
+
+class ProjectsSection(BaseModel):
+    projects: list[Project] = Field(default_factory=list)
+
+
+class EducationSection(BaseModel):
+    education: list[Education] = Field(default_factory=list)
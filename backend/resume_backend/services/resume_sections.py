@@ -0,0 +1,122 @@
+import re
+from dataclasses import dataclass, field
+
+# Splits extracted resume text into the parts GENERATION_MODE=sections writes
+# separately. Heuristic: headings are short lines naming a known section, and a
+# new experience block starts at the first non-bullet line after a bullet, or at
+# a role header: a short line ending in a date range (DOCX text loses its list
+# glyphs, so bullets are often unmarked). A misplaced line only changes which
+# call sees it as context, not the output shape.
+
+SECTION_HEADINGS = {
+    "summary": re.compile(r"(professional |career |executive )?(summary|profile|objective)|about( me)?"),
+    "skills": re.compile(r"(technical |core |key )?(skills|competencies|expertise)( (and|&) \w+)?|technologies|tech stack"),
+    "experience": re.compile(r"(professional |work |relevant |industry )?experience|employment( history)?"
+                             r"|(work|career) history"),
+    "projects": re.compile(r"(personal |selected |side |key |academic )?projects"),
+    "education": re.compile(r"education( (and|&) \w+)?|academic background|qualifications"),
+    "certifications": re.compile(r"certifications?|licen[cs]es( (and|&) certifications)?|courses|awards"),
+}
+
+_HEADING_MAX_CHARS = 40
+_HEADING_PUNCTUATION = re.compile(r"^[#*\s]+|[#*:\s]+$")
+_BULLET = re.compile(r"^\s*([•\-*–·▪●◦■►✓]|\d{1,2}[.)])\s")
+_YEAR = re.compile(r"\b(19|20)\d{2}\b|\bpresent\b|\bcurrent\b", re.IGNORECASE)
+# "2019 – 2021", "Jan 2020 - Present", "(06/2019 to 05/2021)" at the end of the line
+_TRAILING_DATE_RANGE = re.compile(r"\b(19|20)\d{2}\b.{0,12}?(\s[-–—]\s|[-–—]|\sto\s).{0,12}?"
+                                  r"(\b(19|20)\d{2}\b|\bpresent\b|\bcurrent\b|\bnow\b)[\s)\]]*$", re.IGNORECASE)
+_ROLE_HEADER_MAX_CHARS = 100
+# Unmarked bullets read as sentences: "Migrated ...", "Led ...", "Promoted to ... 2018 - 2019"
+_SENTENCE_START = re.compile(r"\s*([a-z]+ed|led|built|ran|drove|grew|won|wrote|made|set|cut|took|taught|oversaw|"
+                             r"began|became|brought|kept|sold|spent|held)\b", re.IGNORECASE)
+
+
+@dataclass
+class ResumeSections:
+    header: str = ""
+    # Summary, skills, certifications and anything under an unknown heading
+    profile: str = ""
+    experience: list[str] = field(default_factory=list)
+    projects: str = ""
+    education: str = ""
+    # Role header lines in the experience section: roughly the number of roles
+    role_headers: int = 0
+
+
+def _heading(line: str) -> str | None:
+    text = _HEADING_PUNCTUATION.sub("", line).lower()
+    if not text or len(text) > _HEADING_MAX_CHARS:
+        return None
+    for name, pattern in SECTION_HEADINGS.items():
+        if pattern.fullmatch(text):
+            return name
+    return None
+
+
+def _role_header(line: str) -> bool:
+    return (len(line.strip()) <= _ROLE_HEADER_MAX_CHARS and not _BULLET.match(line)
+            and not _SENTENCE_START.match(line) and bool(_TRAILING_DATE_RANGE.search(line)))
+
+
+def split_experience(text: str) -> list[str]:
+    blocks: list[list[str]] = []
+    has_bullets = False
+    has_header = False
+    for line in text.split("\n"):
+        if not line.strip():
+            continue
+        bullet = bool(_BULLET.match(line))
+        header = _role_header(line)
+        # Wrapped bullet text continues in lowercase; anything else after a bullet is the next role.
+        # A second role header is the next role too, whether or not its bullets are marked.
+        starts_block = (not blocks or (not bullet and has_bullets and not line.lstrip()[0].islower())
+                        or (header and has_header))
+        if starts_block:
+            blocks.append([])
+            has_bullets = False
+            has_header = False
+        blocks[-1].append(line)
+        has_bullets = has_bullets or bullet
+        has_header = has_header or header
+
+    # A block with neither dates nor bullets is a header line split off its role
+    # ("Acme Corp" above "Engineer, 2020 – 2023"): join it to the next block
+    merged: list[str] = []
+    pending = ""
+    for block in blocks:
+        text = "\n".join(block)
+        if len(blocks) > 1 and not _YEAR.search(text) and not any(_BULLET.match(line) for line in block):
+            pending += text + "\n"
+            continue
+        merged.append(pending + text)
+        pending = ""
+    if pending:
+        if merged:
+            merged[-1] += "\n" + pending.rstrip("\n")
+        else:
+            merged.append(pending.rstrip("\n"))
+    return merged
+
+
+def split_resume(text: str) -> ResumeSections:
+    parts: dict[str, list[str]] = {"header": []}
+    current = "header"
+    for line in text.split("\n"):
+        name = _heading(line)
+        if name is not None:
+            current = name
+            parts.setdefault(current, [])
+        parts.setdefault(current, []).append(line)
+
+    def joined(*names: str) -> str:
+        return "\n".join("\n".join(parts.get(name, [])) for name in names if parts.get(name)).strip()
+
+    experience = parts.get("experience", [])[1:]
+    return ResumeSections(
+        header=joined("header"),
+        profile=joined("summary", "skills", "certifications"),
+        experience=split_experience("\n".join(experience)),
+        projects=joined("projects"),
+        education=joined("education"),
+        role_headers=sum(_role_header(line) for line in experience),
+    )
@@ -0,0 +1,80 @@
+import hashlib
+import logging
+import os
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+import aiofiles
+from resume_backend.core.errors import UploadError
+
+if TYPE_CHECKING:
+    # Annotation only: the parser workers import this module and do not need FastAPI
+    from fastapi import UploadFile
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+
+# Leading bytes of each supported format (DOCX is a zip container)
+MAGIC_BYTES = {
+    ".pdf": b"%PDF-",
+    ".docx": b"PK\x03\x04",
+}
+
+
+@dataclass
+class IngestedUpload:
+    # An upload copied to a private temp file; the parser memory-maps it by path
+    path: str
+    filename: str
+    ext: str
+    size: int
+    sha256: str
+
+    def cleanup(self):
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def _detect_ext(head: bytes) -> str | None:
+    # PDF readers tolerate up to 1 KB of junk before the header
+    if head.find(MAGIC_BYTES[".pdf"], 0, 1024) != -1:
+        return ".pdf"
+    if head.startswith(MAGIC_BYTES[".docx"]):
+        return ".docx"
+    return None
+
+
+async def ingest_upload(upload: "UploadFile", max_bytes: int) -> IngestedUpload:
+    # Streams the upload to disk in fixed-size chunks, so memory stays at one
+    # chunk per request however large the body is. The size limit and the
+    # magic bytes are checked as the data arrives, and the SHA-256 used by
+    # the parse cache is computed in the same pass.
+    digest = hashlib.sha256()
+    size = 0
+    ext = None
+    out = await aiofiles.tempfile.NamedTemporaryFile("wb", prefix="upload-", delete=False)
+    path = out.name
+    try:
+        while chunk := await upload.read(CHUNK_SIZE):
+            if ext is None:
+                ext = _detect_ext(chunk)
+                if ext is None:
+                    raise UploadError("File content is not a PDF or DOCX document.", 400)
+            size += len(chunk)
+            if size > max_bytes:
+                raise UploadError("File too large.", 413)
+            digest.update(chunk)
+            await out.write(chunk)
+        if size == 0:
+            raise UploadError("Uploaded file is empty.", 400)
+    except BaseException:
+        await out.close()
+        os.unlink(path)
+        raise
+    await out.close()
+
+    logger.info(f"Ingested {upload.filename} ({size} bytes, {ext})")
+    return IngestedUpload(path=path, filename=upload.filename or f"resume{ext}", ext=ext, size=size,
+                          sha256=digest.hexdigest())
@@ -0,0 +1,72 @@
+import asyncio
+import logging
+import time
+from resume_backend.core.config import settings
+from resume_backend.services import llm_chain
+from resume_backend.services.document_parser import parser_pool, warm_up_worker as warm_up_parser
+from resume_backend.services.pdf_renderer import render_pool, warm_up_worker as warm_up_renderer
+
+logger = logging.getLogger(__name__)
+
+
+class WarmUp:
+    # Loads at startup what the first requests would otherwise pay for: LangChain and
+    # the model client, the pool worker processes, and the LLM connections. Runs in
+    # the background so the server accepts connections meanwhile; /ready answers 503
+    # until it is done.
+
+    def __init__(self, enabled: bool, llm_connections: int):
+        self.enabled = enabled
+        self.llm_connections = llm_connections
+        self.ready = not enabled
+        self.timings: dict[str, float] = {}
+        self.errors: dict[str, str] = {}
+        self._task: asyncio.Task | None = None
+
+    def start(self):
+        if self.enabled:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await llm_chain.close_connections()
+
+    async def _step(self, name: str, coro):
+        started = time.perf_counter()
+        try:
+            await coro
+        except Exception as e:
+            logger.warning(f"Warm-up step {name} failed: {type(e).__name__}: {str(e)}")
+            self.errors[name] = f"{type(e).__name__}: {str(e)}"
+        finally:
+            self.timings[name] = round(time.perf_counter() - started, 3)
+
+    async def _warm_llm(self):
+        # Imports in a thread so the event loop keeps answering /ready meanwhile
+        await self._step("llm", asyncio.to_thread(llm_chain.warm_up))
+        if "llm" not in self.errors:
+            await self._step("llm_connections", llm_chain.open_connections(self.llm_connections))
+
+    async def _run(self):
+        started = time.perf_counter()
+        await asyncio.gather(
+            self._warm_llm(),
+            self._step("parser_pool", parser_pool.warm_up(warm_up_parser)),
+            self._step("render_pool", render_pool.warm_up(warm_up_renderer)),
+        )
+        # Failed connections are retried by the first requests, and failed pool processes
+        # are replaced by fresh ones that start on their first task;
+        # a model that cannot be built (e.g. no API key) fails every request
+        self.ready = "llm" not in self.errors
+        logger.info(f"Warm-up finished in {time.perf_counter() - started:.2f}s "
+                    f"({', '.join(f'{name} {seconds:.2f}s' for name, seconds in self.timings.items())})"
+                    + ("" if self.ready else ", not ready"))
+
+    def status(self) -> dict:
+        return {"ready": self.ready, "warm_up_seconds": self.timings, "errors": self.errors}
+
+
+warm_up = WarmUp(settings.WARM_UP_ON_STARTUP, settings.GROQ_WARM_CONNECTIONS)
@@ -0,0 +1,123 @@
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from resume_backend.core.errors import ServiceBusyError
+
+logger = logging.getLogger(__name__)
+
+
+def _noop():
+    pass
+
+
+class ProcessWorkerPool:
+    # A fixed number of single-process executors ("slots"). Each task checks out a
+    # slot, so a task that overruns its timeout can be killed and its process
+    # replaced without breaking the tasks running in the other slots.
+
+    def __init__(self, name: str, size: int, timeout: float, queue_limit: int):
+        self.name = name
+        self.size = size
+        self.timeout = timeout
+        self.queue_limit = queue_limit
+        self._slots: asyncio.Queue | None = None
+        self._executors: set[ProcessPoolExecutor] = set()
+        self._waiting = 0
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        # spawn, not fork: the parent is a threaded event loop
+        executor = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+        self._executors.add(executor)
+        return executor
+
+    def _ensure_started(self):
+        if self._slots is None:
+            self._slots = asyncio.Queue()
+            for _ in range(self.size):
+                self._slots.put_nowait(self._new_executor())
+
+    def _kill(self, executor: ProcessPoolExecutor):
+        self._executors.discard(executor)
+        for process in list((executor._processes or {}).values()):
+            process.kill()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    async def run(self, fn, *args):
+        self._ensure_started()
+        if self._slots.empty() and self._waiting >= self.queue_limit:
+            logger.warning(f"{self.name} pool saturated ({self._waiting} waiting), rejecting task")
+            raise ServiceBusyError(f"Server is busy processing other {self.name} tasks, please retry shortly.")
+
+        self._waiting += 1
+        try:
+            executor = await self._slots.get()
+        finally:
+            self._waiting -= 1
+
+        try:
+            future = executor.submit(fn, *args)
+            return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+        except asyncio.TimeoutError:
+            logger.error(f"{self.name} task exceeded {self.timeout}s, killing worker process")
+            self._kill(executor)
+            executor = self._new_executor()
+            raise RuntimeError(f"{self.name.capitalize()} timed out after {self.timeout:g} seconds")
+        except BrokenProcessPool:
+            logger.error(f"{self.name} worker process died, replacing it")
+            self._kill(executor)
+            executor = self._new_executor()
+            raise RuntimeError(f"{self.name.capitalize()} worker crashed")
+        except asyncio.CancelledError:
+            # The child keeps running the abandoned task; put back a fresh worker so the
+            # next caller neither waits behind it nor gets killed for its timeout
+            if not future.done():
+                logger.warning(f"{self.name} task cancelled while running, replacing its worker process")
+                self._kill(executor)
+                executor = self._new_executor()
+            raise
+        finally:
+            self._slots.put_nowait(executor)
+
+    async def warm_up(self, fn=_noop):
+        # Spawns every worker process now, running fn once in each (e.g. to import
+        # what its tasks need), instead of on the first task that lands on it. A worker
+        # that crashes or overruns the timeout is killed and replaced by a fresh
+        # executor, whose process then starts on its first task.
+        self._ensure_started()
+        executors = [await self._slots.get() for _ in range(self.size)]
+        try:
+            results = await asyncio.gather(
+                *(asyncio.wait_for(asyncio.wrap_future(e.submit(fn)), self.timeout) for e in executors),
+                return_exceptions=True)
+        except asyncio.CancelledError:
+            for executor in executors:
+                self._slots.put_nowait(executor)
+            raise
+
+        errors = []
+        for executor, result in zip(executors, results):
+            if isinstance(result, (asyncio.TimeoutError, BrokenProcessPool)):
+                logger.error(f"{self.name} worker failed to warm up ({type(result).__name__}), replacing it")
+                self._kill(executor)
+                executor = self._new_executor()
+            if isinstance(result, BaseException):
+                errors.append(result)
+            self._slots.put_nowait(executor)
+        if errors:
+            raise errors[0]
+
+    def shutdown(self):
+        # Idle workers are joined (shutting down without waiting left them running after
+        # the server exited); a worker still busy with an abandoned task is killed
+        idle = set()
+        while self._slots is not None and not self._slots.empty():
+            idle.add(self._slots.get_nowait())
+        for executor in list(self._executors):
+            if executor in idle:
+                executor.shutdown(wait=True, cancel_futures=True)
+                self._executors.discard(executor)
+            else:
+                self._kill(executor)
+        self._slots = None
@@ -0,0 +1,26 @@
+import pytest
+
+from resume_backend.services.compaction import drop_boilerplate
+
+BENEFITS_AND_EEO = """What we offer
+Benefits include medical, dental and vision coverage for you and your dependents. 401(k) with 4% match.
+Unlimited PTO and 16 weeks of paid parental leave. A $2,000 yearly learning budget and a home office stipend.
+We offer a competitive salary and generous equity.
+You'll receive medical, dental and vision insurance from day one.
+
+Acme Cloud is an equal opportunity employer. We provide reasonable accommodations for candidates with disabilities.
+"""
+
+
+def test_drops_benefits_and_eeo_sentences():
+    assert drop_boilerplate(BENEFITS_AND_EEO) == ""
+
+
+@pytest.mark.parametrize("sentence", [
+    "You will sell the analytics products we offer to enterprise banks.",
+    "Experience administering medical, dental and vision insurance plans across 4 states is required.",
+    "Own the renewal of our benefits package and the 401(k) with employer match.",
+    "Design the perks included in our wellness program.",
+])
+def test_keeps_role_sentences_about_benefits(sentence):
+    assert drop_boilerplate(f"The role\n{sentence}") == f"The role\n{sentence}"
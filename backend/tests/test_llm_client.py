@@ -0,0 +1,260 @@
+"""RateLimitedLLM against a local fake Groq server.
+
+    cd backend
+    python -m pytest tests
+
+The server answers each request with the next scripted response, so a test can
+return 429 with retry-after and then 200, or cut a stream off after its first
+chunk, and count how many requests the wrapper actually made.
+"""
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import groq
+import httpx
+import pytest
+
+from resume_backend.core.errors import ServiceBusyError
+from resume_backend.services.llm_client import RateLimitedLLM
+
+MODEL = "fake-model"
+
+
+def completion(content: str) -> dict:
+    return {
+        "id": "chatcmpl-fake", "object": "chat.completion", "created": 0, "model": MODEL,
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+    }
+
+
+def chunk(content: str) -> bytes:
+    body = {"id": "chatcmpl-fake", "object": "chat.completion.chunk", "created": 0, "model": MODEL,
+            "choices": [{"index": 0, "delta": {"content": content}, "finish_reason": None}]}
+    return f"data: {json.dumps(body)}\n\n".encode()
+
+
+def ok(content: str = "ok"):
+    return 200, {"content-type": "application/json"}, json.dumps(completion(content)).encode()
+
+
+def rate_limited(retry_after: float):
+    body = {"error": {"message": "Rate limit reached", "type": "requests", "code": "rate_limit_exceeded"}}
+    return 429, {"content-type": "application/json", "retry-after": str(retry_after)}, json.dumps(body).encode()
+
+
+def stream(*contents: str):
+    return 200, {"content-type": "text/event-stream"}, b"".join(map(chunk, contents)) + b"data: [DONE]\n\n"
+
+
+def truncated_stream(content: str):
+    # Content-Length promises more than is sent, so the client sees the connection
+    # drop in the middle of the body, after the first chunk
+    body = chunk(content)
+    return 200, {"content-type": "text/event-stream", "content-length": str(len(body) + 1000)}, body
+
+
+class FakeGroq:
+    def __init__(self, responses: list):
+        self.responses = list(responses)
+        self.requests = 0
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("content-length", 0)))
+                fake.requests += 1
+                status, headers, body = fake.responses.pop(0)
+                self.send_response(status)
+                headers.setdefault("content-length", str(len(body)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+                self.wfile.flush()
+                if int(headers["content-length"]) != len(body):
+                    self.close_connection = True
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        self.client = groq.AsyncGroq(api_key="test", base_url=f"http://127.0.0.1:{self._server.server_port}",
+                                     max_retries=0)
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    async def complete(self) -> str:
+        response = await self.client.chat.completions.create(model=MODEL, messages=[{"role": "user", "content": "hi"}])
+        return response.choices[0].message.content
+
+    async def stream(self):
+        response = await self.client.chat.completions.create(model=MODEL, messages=[{"role": "user", "content": "hi"}],
+                                                             stream=True)
+        try:
+            async for part in response:
+                yield part.choices[0].delta.content
+        except httpx.TransportError as e:
+            # The SDK lets transport errors from the body through unwrapped; raise the
+            # kind of error the wrapper would retry, so only the first-chunk rule stops it
+            raise groq.APIConnectionError(request=e.request) from e
+
+
+@pytest.fixture
+def fake_groq():
+    servers = []
+
+    def start(*responses):
+        server = FakeGroq(list(responses))
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.close()
+
+
+def make_llm(**overrides) -> RateLimitedLLM:
+    options = dict(requests_per_minute=6000, tokens_per_minute=1_000_000, max_concurrency=4, queue_timeout=5,
+                   max_retries=2, backoff_base=0.01)
+    options.update(overrides)
+    return RateLimitedLLM(**options)
+
+
+def test_retry_honours_retry_after(fake_groq):
+    server = fake_groq(rate_limited(0.5), ok("done"))
+    llm = make_llm()
+
+    started = time.monotonic()
+    result = asyncio.run(llm.call(server.complete, tokens=10))
+
+    assert result == "done"
+    assert server.requests == 2
+    assert time.monotonic() - started >= 0.5
+
+
+def test_gives_up_with_service_busy_after_max_retries(fake_groq):
+    server = fake_groq(rate_limited(0.1), rate_limited(0.1), rate_limited(2.5))
+    llm = make_llm(max_retries=2)
+
+    with pytest.raises(ServiceBusyError) as raised:
+        asyncio.run(llm.call(server.complete, tokens=10))
+
+    assert server.requests == 3
+    assert raised.value.retry_after == 3
+
+
+def test_aimd_halves_then_regrows_the_limit(fake_groq):
+    server = fake_groq(rate_limited(0.1), *[ok() for _ in range(8)])
+    llm = make_llm(max_concurrency=4)
+
+    async def run():
+        await llm.call(server.complete, tokens=10)
+        # Halved on the 429 (4 -> 2), then one success adds 1/limit
+        assert llm._limit == pytest.approx(2.5)
+        limits = [llm._limit]
+        for _ in range(7):
+            await llm.call(server.complete, tokens=10)
+            limits.append(llm._limit)
+        return limits
+
+    limits = asyncio.run(run())
+    assert limits == sorted(limits)
+    assert limits[-1] == 4.0
+
+
+def test_saturated_bucket_fails_fast_with_retry_after(fake_groq):
+    server = fake_groq(ok())
+    llm = make_llm(requests_per_minute=1, queue_timeout=0.2)
+
+    async def run():
+        await llm.call(server.complete, tokens=10)
+        started = time.monotonic()
+        with pytest.raises(ServiceBusyError) as raised:
+            await llm.call(server.complete, tokens=10)
+        return raised.value, time.monotonic() - started
+
+    error, waited = asyncio.run(run())
+    assert server.requests == 1
+    assert waited < 1
+    # One request per minute: the next one is about 60 s away
+    assert 55 <= error.retry_after <= 60
+
+
+def test_full_concurrency_waits_for_a_slot(fake_groq):
+    server = fake_groq(ok("first"), ok("second"))
+    llm = make_llm(max_concurrency=1, queue_timeout=5)
+
+    async def slow():
+        await asyncio.sleep(0.3)
+        return await server.complete()
+
+    async def run():
+        started = time.monotonic()
+        results = await asyncio.gather(llm.call(slow, tokens=10), llm.call(server.complete, tokens=10))
+        return results, time.monotonic() - started
+
+    results, elapsed = asyncio.run(run())
+    assert results == ["first", "second"]
+    assert server.requests == 2
+    assert 0.3 <= elapsed < 5
+
+
+def test_slot_wait_gives_up_at_the_queue_timeout(fake_groq):
+    server = fake_groq(ok())
+    llm = make_llm(max_concurrency=1, queue_timeout=0.3)
+
+    async def slow():
+        await asyncio.sleep(1)
+        return await server.complete()
+
+    async def run():
+        first = asyncio.create_task(llm.call(slow, tokens=10))
+        await asyncio.sleep(0)
+        started = time.monotonic()
+        with pytest.raises(ServiceBusyError) as raised:
+            await llm.call(server.complete, tokens=10)
+        waited = time.monotonic() - started
+        await first
+        return raised.value, waited
+
+    error, waited = asyncio.run(run())
+    assert 0.3 <= waited < 1
+    assert error.retry_after == 1
+    assert server.requests == 1
+
+
+def test_stream_is_retried_before_its_first_chunk(fake_groq):
+    server = fake_groq(rate_limited(0.1), stream("Hello", " world"))
+    llm = make_llm()
+
+    async def run():
+        return [part async for part in llm.stream(server.stream, tokens=10)]
+
+    assert "".join(filter(None, asyncio.run(run()))) == "Hello world"
+    assert server.requests == 2
+
+
+def test_stream_is_not_retried_after_its_first_chunk(fake_groq):
+    server = fake_groq(truncated_stream("Hello"), stream("never sent"))
+    llm = make_llm()
+    received = []
+
+    async def run():
+        async for part in llm.stream(server.stream, tokens=10):
+            received.append(part)
+
+    with pytest.raises(groq.APIConnectionError):
+        asyncio.run(run())
+    assert received == ["Hello"]
+    assert server.requests == 1
+    assert llm.stats()["active"] == 0
@@ -0,0 +1,36 @@
+from resume_backend.services.resume_sections import split_resume
+
+UNMARKED_RESUME = """Jane Doe
+jane@example.com
+
+EXPERIENCE
+Acme Corp — Senior Software Engineer — Jan 2019 – Present
+Migrated the 2015-2019 order archive to Snowflake
+Promoted to Senior Engineer 2018 - 2019
+Led a team of five engineers
+Globex — Software Engineer — 2015 – 2018
+Built the billing service in Go
+Cut deploy time from 2014 - 2015 levels by half
+
+EDUCATION
+State University — B.S. Computer Science — 2014
+"""
+
+
+def test_dated_bullets_do_not_start_roles():
+    sections = split_resume(UNMARKED_RESUME)
+
+    assert sections.role_headers == 2
+    assert len(sections.experience) == 2
+    assert sections.experience[0].startswith("Acme Corp")
+    assert "Promoted to Senior Engineer 2018 - 2019" in sections.experience[0]
+    assert sections.experience[1].startswith("Globex")
+
+
+def test_marked_bullets_split_by_role():
+    resume = UNMARKED_RESUME.replace("\nMigrated", "\n• Migrated").replace("\nPromoted", "\n• Promoted") \
+        .replace("\nLed", "\n• Led").replace("\nBuilt", "\n• Built").replace("\nCut", "\n• Cut")
+    sections = split_resume(resume)
+
+    assert len(sections.experience) == sections.role_headers == 2
+    assert sections.education.endswith("2014")